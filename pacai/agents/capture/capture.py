@@ -4,6 +4,10 @@ from pacai.agents.base import BaseAgent
 from pacai.core import distanceCalculator
 from pacai.util import util
 
+# The most time (in seconds) to spend computing maze distances when the game starts.
+# Any distances left after that are computed a little each turn (see timeForComputing).
+STARTUP_DISTANCE_TIME = 10.0
+
 class CaptureAgent(BaseAgent):
     """
     A base class for capture agents.
@@ -40,7 +44,7 @@ class CaptureAgent(BaseAgent):
         self.red = gameState.isOnRedTeam(self.index)
         self.distancer = distanceCalculator.Distancer(gameState.getInitialLayout())
 
-        self.distancer.getMazeDistances()
+        self.distancer.getMazeDistances(timeLimit = STARTUP_DISTANCE_TIME)
 
     def final(self, gameState):
         self.observationHistory = []
@@ -64,6 +68,9 @@ class CaptureAgent(BaseAgent):
 
         self.observationHistory.append(gameState)
 
+        if (not self.distancer.isReadyForMazeDistance()):
+            self.distancer.getMazeDistances(timeLimit = self.timeForComputing)
+
         myState = gameState.getAgentState(self.index)
         myPos = myState.getPosition()
 
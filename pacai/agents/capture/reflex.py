@@ -13,12 +13,18 @@ class ReflexCaptureAgent(CaptureAgent):
     def __init__(self, index, **kwargs):
         super().__init__(index, **kwargs)
 
+        # The successors of the state currently being evaluated: (gameState, {action: successor}).
+        # This lets all the successors be generated in one pass (see chooseAction()).
+        self._successorCache = (None, {})
+
     def chooseAction(self, gameState):
         """
         Picks among the actions with the highest return from `ReflexCaptureAgent.evaluate`.
         """
 
-        actions = gameState.getLegalActions(self.index)
+        successors = list(gameState.generateSuccessors(self.index))
+        self._successorCache = (gameState, dict(successors))
+        actions = [action for (action, successor) in successors]
 
         start = time.time()
         values = [self.evaluate(gameState, a) for a in actions]
@@ -34,7 +40,12 @@ class ReflexCaptureAgent(CaptureAgent):
         Finds the next successor which is a grid position (location tuple).
         """
 
-        successor = gameState.generateSuccessor(self.index, action)
+        (cachedState, cachedSuccessors) = self._successorCache
+        if (cachedState is gameState and action in cachedSuccessors):
+            successor = cachedSuccessors[action]
+        else:
+            successor = gameState.generateSuccessor(self.index, action)
+
         pos = successor.getAgentState(self.index).getPosition()
 
         if (pos != util.nearestPoint(pos)):
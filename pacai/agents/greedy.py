@@ -17,11 +17,8 @@ class GreedyAgent(BaseAgent):
 
     def getAction(self, state):
         # Generate candidate actions
-        legal = state.getLegalPacmanActions()
-        if (Directions.STOP in legal):
-            legal.remove(Directions.STOP)
-
-        successors = [(state.generateSuccessor(0, action), action) for action in legal]
+        successors = [(successor, action) for (action, successor) in state.generateSuccessors(0)
+                if action != Directions.STOP]
         scored = [(self.evaluationFunction(state), action) for state, action in successors]
         bestScore = max(scored)[0]
         bestActions = [pair[1] for pair in scored if pair[0] == bestScore]
@@ -1,6 +1,7 @@
 import argparse
 import textwrap
 
+from pacai.core import distanceCalculator
 from pacai.ui import view
 
 def getParser(description, name):
@@ -31,6 +32,13 @@ def getParser(description, name):
             action = 'store_true', default = False,
             help = 'turns on exception handling and timeouts during games (default: %(default)s)')
 
+    parser.add_argument('--distance-cache', dest = 'distanceCache', metavar = 'DIR',
+            action = 'store', type = str, nargs = '?', default = None,
+            const = distanceCalculator.DEFAULT_CACHE_DIR,
+            help = 'save maze distances in this directory so later runs can reuse them\n'
+                + '(without a directory: %s) (default: %%(default)s)'
+                % (distanceCalculator.DEFAULT_CACHE_DIR))
+
     parser.add_argument('--fps', dest = 'fps',
             action = 'store', type = float, default = 15,
             help = 'cap the game to this fps, at zero frames will be animated as fast as possible'
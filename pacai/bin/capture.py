@@ -14,6 +14,7 @@ import sys
 from pacai.agents import keyboard
 from pacai.agents.capture.dummy import DummyAgent
 from pacai.bin.arguments import getParser
+from pacai.core import distanceCalculator
 from pacai.core.actions import Actions
 from pacai.core.distance import manhattan
 from pacai.core.game import Game
@@ -78,18 +79,19 @@ class CaptureGameState(AbstractGameState):
             else:
                 self._blueCapsules.append(capsule)
 
+        # Grids are stored column by column,
+        # so the red side is all the bits below the first blue column.
+        redSideMask = (1 << (int(self._layout.width / 2) * self._food.getHeight())) - 1
+
         self._redFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
-        self._blueFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
+        self._redFood.setBits(self._food.getBits() & redSideMask)
 
-        for x in range(self._food.getWidth()):
-            for y in range(self._food.getHeight()):
-                if (not self._food[x][y]):
-                    continue
+        self._blueFood = Grid(self._food.getWidth(), self._food.getHeight(), initialValue = False)
+        self._blueFood.setBits(self._food.getBits() & ~redSideMask)
 
-                if (self.isOnRedSide((x, y))):
-                    self._redFood[x][y] = True
-                else:
-                    self._blueFood[x][y] = True
+        # Kept up-to-date as food is eaten (see getNumFood()).
+        self._numRedFood = self._redFood.count()
+        self._numBlueFood = self._blueFood.count()
 
     # Override
     def generateSuccessor(self, agentIndex, action):
@@ -111,29 +113,41 @@ class CaptureGameState(AbstractGameState):
 
     # Override
     def eatCapsule(self, x, y):
-        if (not self._capsulesCopied):
+        # The base class copies its capsules (and sets this) the first time one is eaten.
+        capsulesCopied = self._capsulesCopied
+
+        # The base class checks the capsule bits, so there is a capsule to remove below.
+        if (not super().eatCapsule(x, y)):
+            return False
+
+        if (not capsulesCopied):
             self._redCapsules = self._redCapsules.copy()
             self._blueCapsules = self._blueCapsules.copy()
 
-        super().eatCapsule(x, y)
-
         if (self.isOnRedSide((x, y))):
             self._redCapsules.remove((x, y))
         else:
             self._blueCapsules.remove((x, y))
 
+        return True
+
     # Override
     def eatFood(self, x, y):
         if (not self._foodCopied):
             self._redFood = self._redFood.copy()
             self._blueFood = self._blueFood.copy()
 
-        super().eatFood(x, y)
+        if (not super().eatFood(x, y)):
+            return False
 
         if (self.isOnRedSide((x, y))):
-            self._redFood[x][y] = False
+            self._redFood.set(x, y, False)
+            self._numRedFood -= 1
         else:
-            self._blueFood[x][y] = False
+            self._blueFood.set(x, y, False)
+            self._numBlueFood -= 1
+
+        return True
 
     def getBlueCapsules(self):
         """
@@ -161,6 +175,20 @@ class CaptureGameState(AbstractGameState):
 
         return self._blueTeam
 
+    def getNumBlueFood(self):
+        """
+        Get the amount of food left on the blue side.
+        """
+
+        return self._numBlueFood
+
+    def getNumRedFood(self):
+        """
+        Get the amount of food left on the red side.
+        """
+
+        return self._numRedFood
+
     def getRedCapsules(self):
         """
         Get a list of remaining capsules on the red side.
@@ -224,22 +252,35 @@ class CaptureGameState(AbstractGameState):
 
         return self._teams[agentIndex]
 
-    def _applySuccessorAction(self, agentIndex, action):
+    # Override
+    def _getUndoToken(self):
+        return (super()._getUndoToken(), self._timeleft,
+                self._redFood, self._blueFood, self._numRedFood, self._numBlueFood,
+                self._redCapsules, self._blueCapsules)
+
+    # Override
+    def _restoreUndoToken(self, token):
+        (parentToken, self._timeleft,
+                self._redFood, self._blueFood, self._numRedFood, self._numBlueFood,
+                self._redCapsules, self._blueCapsules) = token
+
+        super()._restoreUndoToken(parentToken)
+
+    # Override
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
         """
         Apply the action to the context state (self).
         """
 
         # Find appropriate rules for the agent.
-        AgentRules.applyAction(self, action, agentIndex)
+        AgentRules.applyAction(self, action, agentIndex, validate)
         AgentRules.checkDeath(self, agentIndex)
-        AgentRules.decrementTimer(self.getAgentState(agentIndex))
+        AgentRules.decrementTimer(self.getMutableAgentState(agentIndex))
 
         # Book keeping.
         self._lastAgentMoved = agentIndex
         self._timeleft -= 1
 
-        self._hash = None
-
 class CaptureRules:
     """
     These game rules manage the control flow of a game, deciding when
@@ -255,8 +296,8 @@ class CaptureRules:
         game.state = initState
         game.length = length
 
-        self._totalBlueFood = initState.getBlueFood().count()
-        self._totalRedFood = initState.getRedFood().count()
+        self._totalBlueFood = initState.getNumBlueFood()
+        self._totalRedFood = initState.getNumRedFood()
 
         return game
 
@@ -279,10 +320,10 @@ class CaptureRules:
         redWin = False
         blueWin = False
 
-        if (state.getRedFood().count() <= MIN_FOOD):
+        if (state.getNumRedFood() <= MIN_FOOD):
             logging.info("The Blue team ate all but %d of the opponents' dots." % MIN_FOOD)
             blueWin = True
-        elif (state.getBlueFood().count() <= MIN_FOOD):
+        elif (state.getNumBlueFood() <= MIN_FOOD):
             logging.info("The Red team ate all but %d of the opponents' dots." % MIN_FOOD)
             redWin = True
         else:
@@ -342,20 +383,22 @@ class AgentRules:
         """
 
         agentState = state.getAgentState(agentIndex)
-        return Actions.getPossibleActions(agentState.getPosition(), agentState.getDirection(),
-                state.getWalls())
+        moveTable = state.getInitialLayout().getMoveTable()
+
+        return list(moveTable.getPossibleActions(agentState.getPosition(),
+                agentState.getDirection()))
 
     @staticmethod
-    def applyAction(state, action, agentIndex):
+    def applyAction(state, action, agentIndex, validate = True):
         """
         Edits the state to reflect the results of the action.
+        Callers that already know the action is legal can skip validating it.
         """
 
-        legal = AgentRules.getLegalActions(state, agentIndex)
-        if (action not in legal):
+        if (validate and action not in AgentRules.getLegalActions(state, agentIndex)):
             raise ValueError('Illegal action: ' + str(action))
 
-        agentState = state.getAgentState(agentIndex)
+        agentState = state.getMutableAgentState(agentIndex)
 
         # Update position.
         vector = Actions.directionToVector(action, AgentRules.AGENT_SPEED)
@@ -392,8 +435,8 @@ class AgentRules:
             else:
                 state.addScore(-FOOD_POINTS)
 
-            if ((isRed and state.getBlueFood().count() <= MIN_FOOD)
-                    or (not isRed and state.getRedFood().count() <= MIN_FOOD)):
+            if ((isRed and state.getNumBlueFood() <= MIN_FOOD)
+                    or (not isRed and state.getNumRedFood() <= MIN_FOOD)):
                 state.endGame(True)
 
             return
@@ -414,7 +457,7 @@ class AgentRules:
                 otherTeam = state.getRedTeamIndices()
 
             for agentIndex in otherTeam:
-                state.getAgentState(agentIndex).setScaredTimer(SCARED_TIME)
+                state.getMutableAgentState(agentIndex).setScaredTimer(SCARED_TIME)
 
     @staticmethod
     def decrementTimer(agentState):
@@ -455,10 +498,10 @@ class AgentRules:
             # Otherwise, we are being eatten.
             if (agentState.isBraveGhost() or otherAgentState.isScaredGhost()):
                 state.addScore(teamPointModifier * KILL_POINTS)
-                otherAgentState.respawn()
+                state.getMutableAgentState(otherAgentIndex).respawn()
             else:
                 state.addScore(teamPointModifier * -KILL_POINTS)
-                agentState.respawn()
+                state.getMutableAgentState(agentIndex).respawn()
 
 #############################
 # FRAMEWORK TO START A GAME #
@@ -559,6 +602,9 @@ def readCommand(argv):
     elif options.debug:
         updateLoggingLevel(logging.DEBUG)
 
+    if (options.distanceCache is not None):
+        distanceCalculator.enableDiskCache(options.distanceCache)
+
     viewOptions = {
         'gifFPS': options.gifFPS,
         'gifPath': options.gif,
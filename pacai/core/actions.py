@@ -66,7 +66,7 @@ class Actions:
             next_y = y_int + dy
             next_x = x_int + dx
 
-            if (not walls[next_x][next_y]):
+            if (not walls.get(next_x, next_y)):
                 possible.append(dir)
 
         return possible
@@ -87,7 +87,7 @@ class Actions:
             if (next_y < 0 or next_y == walls.getHeight()):
                 continue
 
-            if (not walls[next_x][next_y]):
+            if (not walls.get(next_x, next_y)):
                 neighbors.append((next_x, next_y))
 
         return neighbors
@@ -97,3 +97,96 @@ class Actions:
         dx, dy = Actions.directionToVector(action)
         x, y = position
         return (x + dx, y + dy)
+
+class MoveTable(object):
+    """
+    The legal moves from every open cell of a maze, computed once up front.
+    Agents spend almost all of their time on grid points,
+    so this turns most legality checks into a single dict lookup.
+    Positions that are not on a grid point fall back to `Actions`.
+
+    Everything returned from a move table is shared, callers should not modify it.
+    """
+
+    def __init__(self, walls):
+        self._walls = walls
+
+        # {(x, y): (action, ...), ...}
+        self._possibleActions = {}
+
+        # {(x, y): ((x, y), ...), ...}
+        self._legalNeighbors = {}
+
+        # {((x, y), direction): (action, ...), ...}
+        self._nonReversingActions = {}
+
+        width = walls.getWidth()
+        height = walls.getHeight()
+
+        for (x, y) in walls.asList(False):
+            possible = []
+            neighbors = []
+
+            for direction, (dx, dy) in Actions._directionsAsList:
+                nextX = x + dx
+                nextY = y + dy
+
+                if (nextX < 0 or nextX >= width or nextY < 0 or nextY >= height):
+                    continue
+
+                if (not walls.get(nextX, nextY)):
+                    possible.append(direction)
+                    neighbors.append((nextX, nextY))
+
+            self._possibleActions[(x, y)] = tuple(possible)
+            self._legalNeighbors[(x, y)] = tuple(neighbors)
+
+            for direction in Actions._directions:
+                self._nonReversingActions[((x, y), direction)] = tuple(
+                        MoveTable._removeReverse(possible, direction))
+
+    def getLegalNeighbors(self, position):
+        """
+        See `Actions.getLegalNeighbors`.
+        """
+
+        neighbors = self._legalNeighbors.get(position)
+        if (neighbors is None):
+            return tuple(Actions.getLegalNeighbors(position, self._walls))
+
+        return neighbors
+
+    def getNonReversingActions(self, position, direction):
+        """
+        Get the possible actions, excluding stopping and reversing direction
+        (unless reversing is the only option).
+        This is how ghosts move.
+        """
+
+        actions = self._nonReversingActions.get((position, direction))
+        if (actions is None):
+            possible = Actions.getPossibleActions(position, direction, self._walls)
+            return tuple(MoveTable._removeReverse(possible, direction))
+
+        return actions
+
+    def getPossibleActions(self, position, direction):
+        """
+        See `Actions.getPossibleActions`.
+        """
+
+        actions = self._possibleActions.get(position)
+        if (actions is None):
+            return tuple(Actions.getPossibleActions(position, direction, self._walls))
+
+        return actions
+
+    @staticmethod
+    def _removeReverse(possibleActions, direction):
+        actions = [action for action in possibleActions if action != Directions.STOP]
+
+        reverse = Actions.reverseDirection(direction)
+        if (reverse in actions and len(actions) > 1):
+            actions.remove(reverse)
+
+        return actions
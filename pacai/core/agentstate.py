@@ -9,9 +9,25 @@ class AgentState:
     The convention for positions, like a graph, is that (0, 0) is the lower left corner,
     x increases horizontally and y increases vertically.
     Therefore, north is the direction of increasing y, or (0, 1).
+
+    Agent states are shared between a game state and its successors until one of them
+    needs to change it (see `pacai.core.gamestate.AbstractGameState.getMutableAgentState`),
+    so a successor only pays for the agent states it actually modifies.
     """
 
-    def __init__(self, position, direction, isPacman):
+    __slots__ = (
+        '_startPosition', '_startDirection', '_startIsPacman',
+        '_position', '_direction', '_isPacman', '_scaredTimer',
+        '_hashKeys', '_zobrist',
+    )
+
+    def __init__(self, position, direction, isPacman, hashKeys = None):
+        """
+        Args:
+            hashKeys: The `pacai.core.zobrist.AgentKeys` for this agent.
+                When supplied, this state's Zobrist key is kept up-to-date as the state changes.
+        """
+
         # Save the starting information for later use.
         self._startPosition = position
         self._startDirection = direction
@@ -23,18 +39,34 @@ class AgentState:
         self._isPacman = isPacman
         self._scaredTimer = 0
 
+        self._hashKeys = hashKeys
+        self._zobrist = None
+        if (hashKeys is not None):
+            self._zobrist = (hashKeys.get('position', position)
+                    ^ hashKeys.get('direction', direction)
+                    ^ hashKeys.get('isPacman', isPacman)
+                    ^ hashKeys.get('scaredTimer', 0))
+
     def copy(self):
-        state = AgentState(self._startPosition, self._startDirection, self._startIsPacman)
+        # Skip the constructor, everything is about to be overwritten.
+        state = AgentState.__new__(AgentState)
+
+        state._startPosition = self._startPosition
+        state._startDirection = self._startDirection
+        state._startIsPacman = self._startIsPacman
 
         state._isPacman = self._isPacman
         state._position = self._position
         state._direction = self._direction
         state._scaredTimer = self._scaredTimer
 
+        state._hashKeys = self._hashKeys
+        state._zobrist = self._zobrist
+
         return state
 
     def decrementScaredTimer(self):
-        self._scaredTimer = max(0, self._scaredTimer - 1)
+        self.setScaredTimer(max(0, self._scaredTimer - 1))
 
     def getDirection(self):
         return self._direction
@@ -48,6 +80,14 @@ class AgentState:
     def getScaredTimer(self):
         return self._scaredTimer
 
+    def getZobristKey(self):
+        """
+        Get the XOR of the Zobrist keys for this agent's current position, direction, etc.
+        Returns None if this state was not given any keys.
+        """
+
+        return self._zobrist
+
     def isBraveGhost(self):
         """
         A ghost that is not scared.
@@ -68,9 +108,11 @@ class AgentState:
         return (self.isGhost() and self.isScared())
 
     def setIsPacman(self, isPacman):
+        self._updateZobrist('isPacman', self._isPacman, isPacman)
         self._isPacman = isPacman
 
     def setScaredTimer(self, timer):
+        self._updateZobrist('scaredTimer', self._scaredTimer, timer)
         self._scaredTimer = timer
 
     def snapToNearestPoint(self):
@@ -78,17 +120,17 @@ class AgentState:
         Move the agent to the nearest point to its current location.
         """
 
-        self._position = util.nearestPoint(self._position)
+        self._setPosition(util.nearestPoint(self._position))
 
     def respawn(self):
         """
         This agent was killed, respawn it at the start as a pacman.
         """
 
-        self._position = self._startPosition
-        self._direction = self._startDirection
-        self._isPacman = self._startIsPacman
-        self._scaredTimer = 0
+        self._setPosition(self._startPosition)
+        self._setDirection(self._startDirection)
+        self.setIsPacman(self._startIsPacman)
+        self.setScaredTimer(0)
 
     def updatePosition(self, vector):
         """
@@ -98,12 +140,30 @@ class AgentState:
         x, y = self._position
         dx, dy = vector
 
-        self._position = (x + dx, y + dy)
+        self._setPosition((x + dx, y + dy))
 
         direction = Actions.vectorToDirection(vector)
         if (direction != Directions.STOP):
             # If this is a zero vector, face the same direction as before.
-            self._direction = direction
+            self._setDirection(direction)
+
+    def _setDirection(self, direction):
+        self._updateZobrist('direction', self._direction, direction)
+        self._direction = direction
+
+    def _setPosition(self, position):
+        self._updateZobrist('position', self._position, position)
+        self._position = position
+
+    def _updateZobrist(self, field, oldValue, newValue):
+        """
+        Swap the key for the old value of a field with the key for its new value.
+        """
+
+        if (self._hashKeys is None or oldValue == newValue):
+            return
+
+        self._zobrist ^= self._hashKeys.get(field, oldValue) ^ self._hashKeys.get(field, newValue)
 
     def __eq__(self, other):
         if (other is None):
@@ -127,4 +187,4 @@ class AgentState:
             scaredString = '!'
 
         return "%s%s: Position: %s, Direction: %s" % (typeString, scaredString,
-                str(self._position), str(self.direction))
+                str(self._position), str(self._direction))
@@ -1,10 +1,69 @@
+import array
+import collections
+import getpass
+import hashlib
+import logging
+import mmap
+import multiprocessing
+import os
+import struct
 import sys
+import tempfile
+import threading
+import time
 
 from pacai.core.distance import manhattan
-from pacai.util import priorityQueue
+from pacai.core.mazeGraph import getMazeGraph
+
+# Shared memory is only available in Python >= 3.8.
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
 
 DEFAULT_DISTANCE = 10000
 
+# The default amount of memory (in bytes) that lazy distances may use for cached rows.
+DEFAULT_LAZY_MAX_BYTES = 8 * 1024 * 1024
+
+# A per-user directory for enableDiskCache().
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(),
+        'pacai-distances-%s' % (str(os.getuid()) if hasattr(os, 'getuid') else getpass.getuser()))
+
+# An environment variable that turns on the disk cache for every process (e.g. a tournament),
+# set it to the cache directory.
+CACHE_DIR_ENV = 'PACAI_DISTANCE_CACHE'
+
+# Where distance matrices are saved so other processes (and later runs) can map them
+# instead of recomputing them.
+# None (the default) only caches distances in memory.
+# Set with enableDiskCache(), the --distance-cache option (see `pacai.bin.arguments`),
+# or the CACHE_DIR_ENV environment variable.
+# The directory must only be accessible by the current user, otherwise it is not used.
+diskCacheDir = os.environ.get(CACHE_DIR_ENV) or None
+
+# Cache files that have not been used for this many seconds are removed.
+diskCacheMaxAge = 7 * 24 * 60 * 60
+
+# When the cache files take up more than this many bytes,
+# the least recently used ones are removed.
+diskCacheMaxBytes = 256 * 1024 * 1024
+
+# Cache files are a header followed by the raw distance array (in the machine's byte order).
+# Header: magic, typecode, byte order ('l' or 'b'), padding, number of cells,
+# SHA-256 of the walls, SHA-256 of the distances.
+CACHE_FILE_MAGIC = b'PACDIST2'
+CACHE_FILE_HEADER = '<8scc2xI32s32s'
+CACHE_FILE_EXTENSION = '.dist'
+
+# Mazes with at least this many open cells compute all-pairs distances with multiple processes.
+# Below this, starting the processes costs more than it saves.
+# Set to None to never use multiple processes.
+parallelMinCells = 2500
+
+# The number of processes used for parallel distances (None means one per core).
+parallelNumWorkers = None
+
 class Distancer(object):
     """
     A class for computing and caching the shortest path between any two points in a given maze.
@@ -14,14 +73,60 @@ class Distancer(object):
     distancer = Distancer(gameState.getInitialLayout())
     distancer.getDistance((1, 1), (10, 10))
     ```
+
+    By default, the distances between all pairs of positions are computed by getMazeDistances().
+    In lazy mode, distances are instead computed one source at a time (the first time they are
+    needed) and only the most recently used sources are kept (see `LazyDistances`).
+    This is much cheaper for agents that only look up distances from a few positions.
+    In contracted mode, distances come from the maze's junction graph (see `pacai.core.mazeGraph`),
+    which only stores distances between junctions and dead ends.
+
+    All-pairs distances can also be computed a little at a time (by giving getMazeDistances()
+    a time limit) or in a background thread (see startBackgroundMazeDistances()).
+    Until they are done, partially computed distances are used (see `PartialDistances`),
+    which are shared by every distancer on the same walls.
+    Mazes that are large enough to use multiple processes (see parallelMinCells)
+    are instead computed all at once, ignoring any time limit.
     """
 
-    def __init__(self, layout):
+    def __init__(self, layout, lazy = False, lazyMaxBytes = DEFAULT_LAZY_MAX_BYTES,
+            contracted = False):
         self._distances = None
+        self._lazy = lazy or contracted
         self.dc = DistanceCalculator(layout, self)
 
-    def getMazeDistances(self):
-        self.dc.run()
+        # The distances being computed when there is a time limit.
+        self._partialDistances = None
+
+        if (contracted):
+            self._distances = getMazeGraph(layout.walls)
+        elif (lazy):
+            self._distances = LazyDistances(layout.walls, lazyMaxBytes)
+
+    def getMazeDistances(self, timeLimit = None):
+        """
+        Compute the distances between all pairs of positions.
+        If a time limit (in seconds) is given, then stop after about that long
+        and use the distances computed so far.
+        Calling this again continues where the last call left off.
+        Returns true if all the distances are ready.
+        """
+
+        if (self._lazy):
+            return True
+
+        if (timeLimit is None and self._partialDistances is None):
+            self.dc.run()
+            return True
+
+        partialDistances = self._startPartialDistances()
+        if (partialDistances is None):
+            return True
+
+        if (partialDistances.advance(timeLimit)):
+            self._finishPartialDistances(partialDistances)
+
+        return self.isReadyForMazeDistance()
 
     def getDistance(self, pos1, pos2):
         """
@@ -47,15 +152,118 @@ class Distancer(object):
 
         return bestDistance
 
+    def getDistances(self, source, targets):
+        """
+        Get the distance from the source to each of the targets (in the same order).
+        This gives the same distances as calling getDistance() for each target,
+        but (when all the positions are on the grid) the source is only looked up once
+        and every distance comes from the same row of distances.
+        """
+
+        if (self._distances is None):
+            return [manhattan(source, target) for target in targets]
+
+        if (isInt(source) and all(isInt(target) for target in targets)):
+            try:
+                return self._distances.getDistancesFrom(source, targets)
+            except KeyError:
+                # Raise the same error as getDistance() for the first position not in the grid.
+                for target in targets:
+                    self.getDistanceOnGrid(source, target)
+
+                raise
+
+        # Fractional positions need to be snapped onto the grid.
+        return [self.getDistance(source, target) for target in targets]
+
     def getDistanceOnGrid(self, pos1, pos2):
         key = (pos1, pos2)
         if key in self._distances:
-            return self._distances[key]
+            return self._distances.getDistance(pos1, pos2)
 
         raise Exception("Position not in grid: " + str(key))
 
+    def getNearest(self, source, targets):
+        """
+        Get the target that is closest to the source and its distance: (target, distance).
+        Ties go to the target that appears first.
+        Raises a ValueError if there are no targets.
+        """
+
+        if (len(targets) == 0):
+            raise ValueError('No targets to find the nearest of.')
+
+        distances = self.getDistances(source, targets)
+        nearest = min(range(len(distances)), key = distances.__getitem__)
+
+        return (targets[nearest], distances[nearest])
+
     def isReadyForMazeDistance(self):
-        return (self._distances is not None)
+        return (self._distances is not None and self._partialDistances is None)
+
+    def startBackgroundMazeDistances(self):
+        """
+        Compute the distances between all pairs of positions in a background (daemon) thread.
+        Distances are available as they are computed (see getMazeDistances()).
+        Note that the background thread competes with the main thread for the interpreter.
+        """
+
+        partialDistances = self._startPartialDistances()
+        if (partialDistances is None):
+            return
+
+        def run():
+            partialDistances.advance()
+            self._finishPartialDistances(partialDistances)
+
+        thread = threading.Thread(target = run, daemon = True)
+        thread.start()
+
+    def _finishPartialDistances(self, partialDistances):
+        if (self._partialDistances is not partialDistances):
+            return
+
+        walls = self.dc.layout.walls
+
+        # Another distancer sharing these partial distances may have already finished them.
+        self._distances = getCachedDistanceMatrix(walls)
+        if (self._distances is None):
+            self._distances = partialDistances.getMatrix()
+            cacheDistanceMatrix(walls, self._distances)
+
+        partialMap.pop(wallsKey(walls), None)
+        self._partialDistances = None
+
+    def _startPartialDistances(self):
+        """
+        Get the distances currently being computed (starting them if necessary).
+        Returns None if the distances are already done (or were already cached).
+        """
+
+        if (self._partialDistances is not None):
+            return self._partialDistances
+
+        if (self.isReadyForMazeDistance()):
+            return None
+
+        walls = self.dc.layout.walls
+
+        matrix = getCachedDistanceMatrix(walls)
+        if (matrix is None and _getNumWorkers(walls.count(False)) > 1):
+            matrix = getDistanceMatrix(walls)
+
+        if (matrix is not None):
+            self._distances = matrix
+            return None
+
+        key = wallsKey(walls)
+        if (key not in partialMap):
+            partialMap[key] = PartialDistances(walls)
+
+        self._partialDistances = partialMap[key]
+        self._distances = self._partialDistances
+
+        return self._partialDistances
 
 def isInt(pos):
     x, y = pos
@@ -78,79 +286,722 @@ def getGrids1D(x):
 # MACHINERY FOR COMPUTING MAZE DISTANCES #
 ##########################################
 
+# Distance matrices shared by the entire process: {wallsKey(walls): DistanceMatrix, ...}.
 distanceMap = {}
 
+# Lazy distances shared by the entire process (see getDistanceOracle()).
+oracleMap = {}
+
+# Partial distances that are still being computed (see Distancer.getMazeDistances()):
+# {wallsKey(walls): PartialDistances, ...}.
+partialMap = {}
+
 class DistanceCalculator:
     def __init__(self, layout, distancer):
         self.layout = layout
         self.distancer = distancer
-        self.cache = {}
+        self.cache = distanceMap
 
     def run(self):
-        if self.layout.walls not in self.cache:
-            self.cache[self.layout.walls] = computeDistances(self.layout)
+        self.distancer._distances = getDistanceMatrix(self.layout.walls)
+
+class MazeIndex(object):
+    """
+    A dense index of the open (non-wall) cells in a walls grid.
+    Each open cell gets an index in [0, numCells) (in the order of `Grid.asList(False)`),
+    and the neighbors of each cell are stored as indexes.
+    This lets searches over the maze work on small ints and flat arrays instead of position tuples.
+    """
+
+    def __init__(self, walls):
+        self.positions = walls.asList(False)
+        self.indexes = {position: index for (index, position) in enumerate(self.positions)}
+        self.numCells = len(self.positions)
+
+        self.neighbors = []
+        for (x, y) in self.positions:
+            adjacent = []
+            for neighbor in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+                if (neighbor in self.indexes):
+                    adjacent.append(self.indexes[neighbor])
+
+            self.neighbors.append(tuple(adjacent))
+
+        # The array type used to store distances.
+        # Distances are always less than the number of cells,
+        # so unsigned shorts are enough for everything but enormous layouts.
+        if (self.numCells < 0xFFFF):
+            self.typecode = 'H'
+        else:
+            self.typecode = 'I'
+
+        self.unreachable = 2 ** (8 * array.array(self.typecode).itemsize) - 1
+
+    def bfs(self, source):
+        """
+        Get the distance from the cell with the given index to every cell (by index).
+        Every move costs the same, so a plain breadth first search is enough.
+        Cells that cannot be reached have a distance of self.unreachable.
+        """
+
+        neighbors = self.neighbors
+        unreachable = self.unreachable
+
+        row = array.array(self.typecode, [unreachable]) * self.numCells
+        row[source] = 0
+
+        distance = 0
+        frontier = [source]
+
+        while (len(frontier) > 0):
+            distance += 1
+            nextFrontier = []
+
+            for cell in frontier:
+                for neighbor in neighbors[cell]:
+                    if (row[neighbor] == unreachable):
+                        row[neighbor] = distance
+                        nextFrontier.append(neighbor)
+
+            frontier = nextFrontier
+
+        return row
+
+class DistanceMatrix(object):
+    """
+    The maze distance between every pair of open cells in a walls grid.
+    Distances are stored in a single flat array (uint16 for all normal layouts),
+    where the distance between the cells with indexes i and j is at (i * numCells + j).
+    This is far smaller than a dict keyed by pairs of positions,
+    and getting a distance is two dict lookups and an array access.
+    """
+
+    def __init__(self, walls, distances = None):
+        """
+        If distances is supplied, then it is used as the matrix (e.g. a memory-mapped cache file)
+        instead of computing distances.
+        """
+
+        self._index = MazeIndex(walls)
+
+        if (distances is not None):
+            self._distances = distances
+            return
+
+        numCells = self._index.numCells
+
+        numWorkers = _getNumWorkers(numCells)
+        if (numWorkers > 1):
+            self._distances = _computeParallel(walls, self._index, numWorkers)
+            return
+
+        self._distances = array.array(self._index.typecode)
+        for source in range(numCells):
+            self._distances.extend(self._index.bfs(source))
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the distance between two (int) positions.
+        Raises a KeyError if either position is not an open cell.
+        If there is no path between the positions, then sys.maxsize is returned.
+        """
+
+        index = self._index
+        distance = self._distances[index.indexes[pos1] * index.numCells + index.indexes[pos2]]
+
+        if (distance == index.unreachable):
+            return sys.maxsize
+
+        return distance
+
+    def getDistancesFrom(self, source, targets):
+        """
+        Get the distances from one (int) position to a list of (int) positions.
+        See getDistance().
+        """
+
+        index = self._index
+        indexes = index.indexes
+        distances = self._distances
+        offset = indexes[source] * index.numCells
+
+        return _fixUnreachable([distances[offset + indexes[target]] for target in targets],
+                index.unreachable)
+
+    def getIndex(self):
+        return self._index
+
+    def getRawDistances(self):
+        """
+        Get the flat array (or buffer) holding all the distances.
+        """
+
+        return self._distances
+
+    def __contains__(self, pair):
+        """
+        Check if there is a distance for a pair of positions, e.g. ((1, 1), (2, 1)) in distances.
+        """
+
+        indexes = self._index.indexes
+        return pair[0] in indexes and pair[1] in indexes
+
+class PartialDistances(object):
+    """
+    All-pairs maze distances that are computed a few sources (rows) at a time (see advance()),
+    so that the work can be spread out over time or done in another thread.
+    Queries between two positions that both have no row yet use the Manhattan distance
+    (which never overestimates the maze distance), and the source of that query is computed next.
+    Once all the rows are done, getMatrix() gives the full `DistanceMatrix`.
+    """
+
+    def __init__(self, walls):
+        self._walls = walls
+        self._index = MazeIndex(walls)
+
+        numCells = self._index.numCells
+
+        # Rows are only set once they are complete, so readers never see a partial row.
+        self._rows = [None] * numCells
+        self._numDone = 0
+
+        # Sources that have been (or are being) computed.
+        self._claimed = bytearray(numCells)
+        self._nextSource = 0
+
+        # Sources that were queried before they were computed (each source is only added once).
+        self._requested = []
+        self._queued = bytearray(numCells)
+
+        self._lock = threading.Lock()
+
+    def advance(self, timeLimit = None):
+        """
+        Compute rows for about timeLimit seconds (or until all the rows are done if None).
+        Returns true if all the rows are done.
+        """
+
+        deadline = None
+        if (timeLimit is not None):
+            deadline = time.time() + timeLimit
+
+        while (True):
+            source = self._claimSource()
+            if (source is None):
+                break
+
+            self._rows[source] = self._index.bfs(source)
+
+            with self._lock:
+                self._numDone += 1
+
+            if (deadline is not None and time.time() >= deadline):
+                break
+
+        return self.isDone()
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the distance between two (int) positions.
+        Raises a KeyError if either position is not an open cell.
+        If there is no path between the positions, then sys.maxsize is returned.
+        """
+
+        index1 = self._index.indexes[pos1]
+        index2 = self._index.indexes[pos2]
+
+        row = self._rows[index1]
+        if (row is None):
+            row = self._rows[index2]
+            index2 = index1
+
+        if (row is None):
+            with self._lock:
+                if (not self._claimed[index1] and not self._queued[index1]):
+                    self._queued[index1] = 1
+                    self._requested.append(index1)
+
+            return manhattan(pos1, pos2)
+
+        distance = row[index2]
+        if (distance == self._index.unreachable):
+            return sys.maxsize
+
+        return distance
+
+    def getDistancesFrom(self, source, targets):
+        """
+        Get the distances from one (int) position to a list of (int) positions.
+        See getDistance().
+        """
+
+        indexes = self._index.indexes
+        row = self._rows[indexes[source]]
 
-        self.distancer._distances = self.cache[self.layout.walls]
+        if (row is None):
+            return [self.getDistance(source, target) for target in targets]
+
+        return _fixUnreachable([row[indexes[target]] for target in targets],
+                self._index.unreachable)
+
+    def getIndex(self):
+        return self._index
+
+    def getMatrix(self):
+        """
+        Get the complete `DistanceMatrix` (all the rows must be done).
+        """
+
+        if (not self.isDone()):
+            raise RuntimeError('Not all distances have been computed.')
+
+        distances = array.array(self._index.typecode)
+        for row in self._rows:
+            distances.extend(row)
+
+        return DistanceMatrix(self._walls, distances)
+
+    def getNumDone(self):
+        return self._numDone
+
+    def isDone(self):
+        return self._numDone == self._index.numCells
+
+    def _claimSource(self):
+        """
+        Pick the next source to compute (requested sources first).
+        Returns None if every source has already been claimed.
+        """
+
+        with self._lock:
+            while (len(self._requested) > 0):
+                source = self._requested.pop()
+                if (not self._claimed[source]):
+                    self._claimed[source] = 1
+                    return source
+
+            while (self._nextSource < self._index.numCells):
+                source = self._nextSource
+                self._nextSource += 1
+
+                if (not self._claimed[source]):
+                    self._claimed[source] = 1
+                    return source
+
+        return None
+
+    def __contains__(self, pair):
+        """
+        Check if there is a distance for a pair of positions, e.g. ((1, 1), (2, 1)) in distances.
+        """
+
+        indexes = self._index.indexes
+        return pair[0] in indexes and pair[1] in indexes
+
+class LazyDistances(object):
+    """
+    Maze distances that are computed one source at a time, the first time they are needed.
+    Each source's row of distances is found with a BFS (see `MazeIndex.bfs`),
+    and the most recently used rows are kept in an LRU cache limited to maxBytes of memory.
+    Since distances are symmetric, a cached row for either position answers a query.
+
+    Hits, misses, and evictions are counted for tuning the memory limit (see getStats()).
+    """
+
+    def __init__(self, walls, maxBytes = DEFAULT_LAZY_MAX_BYTES):
+        self._index = MazeIndex(walls)
+
+        # Always keep at least one row, or nothing would ever be reused.
+        rowBytes = max(1, self._index.numCells * array.array(self._index.typecode).itemsize)
+        self._maxRows = max(1, maxBytes // rowBytes)
+
+        # {source index: row, ...} in least to most recently used order.
+        self._rows = collections.OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the distance between two (int) positions.
+        Raises a KeyError if either position is not an open cell.
+        If there is no path between the positions, then sys.maxsize is returned.
+        """
+
+        index1 = self._index.indexes[pos1]
+        index2 = self._index.indexes[pos2]
+
+        # Prefer an existing row for either position.
+        if (index1 not in self._rows and index2 in self._rows):
+            index1, index2 = index2, index1
+
+        distance = self.getRow(index1)[index2]
+
+        if (distance == self._index.unreachable):
+            return sys.maxsize
+
+        return distance
+
+    def getDistancesFrom(self, source, targets):
+        """
+        Get the distances from one (int) position to a list of (int) positions.
+        See getDistance().
+        """
+
+        indexes = self._index.indexes
+        row = self.getRow(indexes[source])
+
+        return _fixUnreachable([row[indexes[target]] for target in targets],
+                self._index.unreachable)
+
+    def getIndex(self):
+        return self._index
+
+    def getRow(self, source):
+        """
+        Get the distances from the cell with the given index to every cell (by index),
+        computing them if they are not cached.
+        """
+
+        row = self._rows.get(source)
+        if (row is not None):
+            self.hits += 1
+            self._rows.move_to_end(source)
+            return row
+
+        self.misses += 1
+
+        row = self._index.bfs(source)
+        self._rows[source] = row
+
+        if (len(self._rows) > self._maxRows):
+            self._rows.popitem(last = False)
+            self.evictions += 1
+
+        return row
+
+    def getStats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'rows': len(self._rows),
+            'maxRows': self._maxRows,
+        }
+
+    def __contains__(self, pair):
+        """
+        Check if there is a distance for a pair of positions, e.g. ((1, 1), (2, 1)) in distances.
+        """
+
+        indexes = self._index.indexes
+        return pair[0] in indexes and pair[1] in indexes
 
 def computeDistances(layout):
     """
-    Runs UCS to all other positions from each position.
+    Compute the maze distance between every pair of open cells in the layout.
+    See `DistanceMatrix`.
     """
 
-    distances = {}
-    allNodes = layout.walls.asList(False)
+    return DistanceMatrix(layout.walls)
 
-    for source in allNodes:
-        dist = {}
-        closed = {}
+def cacheDistanceMatrix(walls, matrix):
+    """
+    Add a matrix to the process-wide and on-disk caches (see getDistanceMatrix()).
+    """
 
-        for node in allNodes:
-            dist[node] = sys.maxsize
+    key = wallsKey(walls)
+    distanceMap[key] = matrix
 
-        queue = priorityQueue.PriorityQueue()
-        queue.push(source, 0)
-        dist[source] = 0
+    cacheDir = _getCacheDir()
+    if (cacheDir is not None):
+        _saveCacheFile(os.path.join(cacheDir, key + CACHE_FILE_EXTENSION), walls, matrix)
+        _pruneCacheDir(cacheDir)
 
-        while not queue.isEmpty():
-            node = queue.pop()
-            if node in closed:
-                continue
+def enableDiskCache(directory = DEFAULT_CACHE_DIR):
+    """
+    Save distance matrices in a directory (see diskCacheDir).
+    Pass None to turn the disk cache back off.
+    """
 
-            closed[node] = True
-            nodeDist = dist[node]
-            adjacent = []
-            x, y = node
+    global diskCacheDir
+    diskCacheDir = directory
+
+def getCachedDistanceMatrix(walls):
+    """
+    Get the `DistanceMatrix` for a walls grid from the process-wide or on-disk cache.
+    Returns None if the matrix is not cached.
+    """
+
+    key = wallsKey(walls)
+    if (key in distanceMap):
+        return distanceMap[key]
+
+    cacheDir = _getCacheDir()
+    if (cacheDir is None):
+        return None
+
+    matrix = _loadCacheFile(os.path.join(cacheDir, key + CACHE_FILE_EXTENSION), walls)
+    if (matrix is not None):
+        distanceMap[key] = matrix
+
+    return matrix
+
+def getDistanceOracle(walls):
+    """
+    Get something that can answer distance queries on a walls grid as cheaply as possible.
+    If the full `DistanceMatrix` is already cached (see getCachedDistanceMatrix()),
+    then that is used.
+    Otherwise, a process-wide `LazyDistances` is used,
+    so each source only costs a single BFS (the first time it is used).
+    """
+
+    matrix = getCachedDistanceMatrix(walls)
+    if (matrix is not None):
+        return matrix
+
+    key = wallsKey(walls)
+    if (key not in oracleMap):
+        oracleMap[key] = LazyDistances(walls)
+
+    return oracleMap[key]
+
+def getDistanceMatrix(walls):
+    """
+    Get the `DistanceMatrix` for a walls grid, computing it only if it is not already cached.
+    Matrices are cached for the entire process (so every agent and every game on the same layout
+    shares one matrix) and, if enableDiskCache() was called, on disk in diskCacheDir.
+    Cache files are memory-mapped read-only, so loading one only costs checking its checksum.
+    """
+
+    matrix = getCachedDistanceMatrix(walls)
+    if (matrix is None):
+        matrix = DistanceMatrix(walls)
+        cacheDistanceMatrix(walls, matrix)
+
+    return matrix
 
-            if not layout.isWall((x, y + 1)):
-                adjacent.append((x, y + 1))
+def wallsKey(walls):
+    """
+    Get a key for a walls grid that is stable across processes
+    (unlike hash(), which is salted per process).
+    """
+
+    return hashlib.sha1(_wallsText(walls)).hexdigest()
 
-            if not layout.isWall((x, y - 1)):
-                adjacent.append((x, y - 1))
+def _computeParallel(walls, index, numWorkers):
+    """
+    Compute all-pairs distances by splitting the sources between a pool of processes.
+    Each process writes its rows directly into a shared memory matrix (see _computeRows()),
+    so rows never have to be sent back between processes.
+    """
 
-            if not layout.isWall((x + 1, y)):
-                adjacent.append((x + 1, y))
+    numCells = index.numCells
+    itemsize = array.array(index.typecode).itemsize
+    size = numCells * numCells * itemsize
 
-            if not layout.isWall((x - 1, y)):
-                adjacent.append((x - 1, y))
+    # Several chunks per worker, so workers that finish early can pick up more.
+    chunkSize = max(1, numCells // (numWorkers * 4))
+    chunks = [(start, min(numCells, start + chunkSize)) for start in range(0, numCells, chunkSize)]
 
-            for other in adjacent:
-                if other not in dist:
-                    continue
+    sharedMatrix = shared_memory.SharedMemory(create = True, size = max(1, size))
 
-                oldDist = dist[other]
-                newDist = nodeDist + 1
-                if newDist < oldDist:
-                    dist[other] = newDist
-                    queue.push(other, newDist)
+    try:
+        tasks = [(sharedMatrix.name, walls, start, end) for (start, end) in chunks]
 
-        for target in allNodes:
-            distances[(target, source)] = dist[target]
+        with multiprocessing.Pool(numWorkers) as pool:
+            pool.map(_computeRows, tasks)
+
+        # Copy straight out of the shared buffer (without making a bytes object first).
+        distances = array.array(index.typecode)
+        with sharedMatrix.buf[:size] as buffer:
+            distances.frombytes(buffer)
+    finally:
+        sharedMatrix.close()
+        sharedMatrix.unlink()
 
     return distances
 
+def _computeRows(task):
+    """
+    Compute the rows for the sources in [start, end) and write them into the shared matrix.
+    Run in a worker process by _computeParallel().
+    """
+
+    (name, walls, start, end) = task
+
+    index = MazeIndex(walls)
+    rowSize = index.numCells * array.array(index.typecode).itemsize
+
+    sharedMatrix = shared_memory.SharedMemory(name = name)
+
+    try:
+        for source in range(start, end):
+            offset = source * rowSize
+            sharedMatrix.buf[offset:(offset + rowSize)] = index.bfs(source).tobytes()
+    finally:
+        sharedMatrix.close()
+
+def _fixUnreachable(distances, unreachable):
+    """
+    Replace the unreachable marker in a list of distances with sys.maxsize.
+    """
+
+    if (unreachable not in distances):
+        return distances
+
+    return [sys.maxsize if (distance == unreachable) else distance for distance in distances]
+
+def _getNumWorkers(numCells):
+    """
+    Get the number of processes to compute all-pairs distances for a maze with.
+    1 means the distances should be computed in this process.
+    """
+
+    if (shared_memory is None or parallelMinCells is None or numCells < parallelMinCells):
+        return 1
+
+    if (parallelNumWorkers is not None):
+        return parallelNumWorkers
+
+    return os.cpu_count() or 1
+
+def _getCacheDir():
+    """
+    Get diskCacheDir (creating it if needed).
+    Returns None if there is no disk cache,
+    or if the directory could be changed by other users (who could then fake distances).
+    """
+
+    if (diskCacheDir is None):
+        return None
+
+    try:
+        os.makedirs(diskCacheDir, mode = 0o700, exist_ok = True)
+        stat = os.stat(diskCacheDir)
+    except OSError as ex:
+        logging.debug("Could not create distance cache directory '%s': %s" % (diskCacheDir, ex))
+        return None
+
+    if (hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o077)):
+        logging.warning("Not using distance cache directory '%s'," % (diskCacheDir)
+                + " it must be owned by the current user and not accessible by anyone else.")
+        return None
+
+    return diskCacheDir
+
+def _loadCacheFile(path, walls):
+    """
+    Map a cache file written by _saveCacheFile().
+    The file is only used if it was written for these walls and its distances are intact.
+    Returns None if there is no usable cache file.
+    """
+
+    if (not os.path.isfile(path)):
+        return None
+
+    index = MazeIndex(walls)
+    itemsize = array.array(index.typecode).itemsize
+    headerSize = struct.calcsize(CACHE_FILE_HEADER)
+
+    try:
+        with open(path, 'rb') as file:
+            header = struct.unpack(CACHE_FILE_HEADER, file.read(headerSize))
+            if (header[:5] != (CACHE_FILE_MAGIC, index.typecode.encode(),
+                    sys.byteorder[0].encode(), index.numCells,
+                    hashlib.sha256(_wallsText(walls)).digest())):
+                return None
+
+            if (os.path.getsize(path) != headerSize + index.numCells ** 2 * itemsize):
+                return None
+
+            if (index.numCells == 0):
+                return DistanceMatrix(walls, array.array(index.typecode))
+
+            cacheMap = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        # Mark the file as recently used (see _pruneCacheDir()).
+        os.utime(path)
+    except (OSError, struct.error) as ex:
+        logging.debug("Could not load distance cache file '%s': %s" % (path, ex))
+        return None
+
+    distances = memoryview(cacheMap)[headerSize:]
+    if (hashlib.sha256(distances).digest() != header[5]):
+        logging.debug("Distance cache file '%s' does not match its checksum." % (path))
+        return None
+
+    return DistanceMatrix(walls, distances.cast(index.typecode))
+
+def _pruneCacheDir(cacheDir):
+    """
+    Remove cache files that have not been used for diskCacheMaxAge,
+    and then the least recently used files until the rest fit in diskCacheMaxBytes.
+    """
+
+    now = time.time()
+    files = []
+
+    try:
+        for entry in os.scandir(cacheDir):
+            if (entry.name.endswith(CACHE_FILE_EXTENSION) and entry.is_file()):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+    except OSError as ex:
+        logging.debug("Could not list distance cache directory '%s': %s" % (cacheDir, ex))
+        return
+
+    # Most recently used first.
+    files.sort(reverse = True)
+
+    totalSize = 0
+    for (mtime, size, path) in files:
+        totalSize += size
+
+        if ((diskCacheMaxAge is None or now - mtime <= diskCacheMaxAge)
+                and (diskCacheMaxBytes is None or totalSize <= diskCacheMaxBytes)):
+            continue
+
+        try:
+            os.remove(path)
+        except OSError as ex:
+            logging.debug("Could not remove distance cache file '%s': %s" % (path, ex))
+
+def _saveCacheFile(path, walls, matrix):
+    """
+    Save a matrix for _loadCacheFile().
+    The file is written under a temporary name and then moved into place,
+    so other processes never see a partial file.
+    Failing to write the cache is not an error, the distances will just be computed again later.
+    """
+
+    index = matrix.getIndex()
+    distances = matrix.getRawDistances()
+
+    header = struct.pack(CACHE_FILE_HEADER, CACHE_FILE_MAGIC, index.typecode.encode(),
+            sys.byteorder[0].encode(), index.numCells,
+            hashlib.sha256(_wallsText(walls)).digest(), hashlib.sha256(distances).digest())
+
+    tempPath = '%s.%d.tmp' % (path, os.getpid())
+
+    try:
+        with open(tempPath, 'wb') as file:
+            file.write(header)
+            file.write(distances)
+
+        os.replace(tempPath, path)
+    except OSError as ex:
+        logging.debug("Could not save distance cache file '%s': %s" % (path, ex))
+
+        if (os.path.exists(tempPath)):
+            os.remove(tempPath)
+
+def _wallsText(walls):
+    return ('%d,%d,%x' % (walls.getWidth(), walls.getHeight(), walls.getBits())).encode()
+
 def getDistanceOnGrid(distances, pos1, pos2):
-    key = (pos1, pos2)
-    if key in distances:
-        return distances[key]
+    if ((pos1, pos2) in distances):
+        return distances.getDistance(pos1, pos2)
 
     return DEFAULT_DISTANCE
@@ -1,8 +1,10 @@
 import abc
+import bisect
 import copy
 
 from pacai.core.agentstate import AgentState
 from pacai.core.directions import Directions
+from pacai.core.grid import ReadOnlyGrid
 from pacai.util import util
 
 class AbstractGameState(abc.ABC):
@@ -21,10 +23,7 @@ class AbstractGameState(abc.ABC):
         self._win = False
 
         self._layout = layout
-
-        # Keep a copy of the hash, since it is expensive to compute.
-        # Any children should be sure to clear the hash when modifications are made.
-        self._hash = None
+        hashKeys = layout.getHashKeys()
 
         # For food and capsules, we will only copy on write (if we eat one of them).
         # This avoid additional copies on successors that don't eat.
@@ -33,17 +32,45 @@ class AbstractGameState(abc.ABC):
         self._food = layout.food.copy()
         self._lastFoodEaten = None
 
+        # A read-only view of the food (see getFood()) and the sorted positions of the remaining
+        # food (see getFoodPositions()), both made on demand.
+        # When food is eaten, the view is dropped and the eaten food is removed from (a copy of)
+        # the positions.
+        # Successors share these with their parent until they eat.
+        self._foodView = None
+        self._foodPositions = None
+
+        # Kept up-to-date as food is eaten, so we never need to count the grid.
+        self._numFood = self._food.count()
+
         self._capsulesCopied = False
         self._capsules = layout.capsules.copy()
         self._lastCapsuleEaten = None
 
+        # The capsules as a bitset (in the same layout as a `pacai.core.grid.Grid`)
+        # for constant time lookups.
+        # Since ints are immutable, this never needs to be copied.
+        self._capsuleBits = 0
+        for (x, y) in self._capsules:
+            self._capsuleBits |= 1 << (x * layout.height + y)
+
+        # The board (food and capsules) part of this state's Zobrist hash.
+        # This is updated as food/capsules are eaten,
+        # while each agent state keeps its own part of the hash up-to-date.
+        self._boardHash = hashKeys.foodHash(self._food) ^ hashKeys.capsulesHash(self._capsules)
+
         # An ordered list of locations that this state considers special.
         # A view may choose to specially represent these locations.
         self._highlightLocations = []
 
+        # Agent states are copy on write (see getMutableAgentState()).
+        # A state starts out owning all of its agent states.
         self._agentStates = []
         for (isPacman, position) in layout.agentPositions:
-            self._agentStates.append(AgentState(position, Directions.STOP, isPacman))
+            agentKeys = hashKeys.getAgentKeys(len(self._agentStates))
+            self._agentStates.append(AgentState(position, Directions.STOP, isPacman, agentKeys))
+
+        self._agentStatesCopied = [True] * len(self._agentStates)
 
         self._score = 0
 
@@ -64,10 +91,38 @@ class AbstractGameState(abc.ABC):
 
         pass
 
+    @abc.abstractmethod
+    def _applySuccessorAction(self, agentIndex, action, validate = True):
+        """
+        Apply the action to the context state (self).
+        If validate is false, then the caller guarantees that the action is legal.
+        """
+
+        pass
+
     def addScore(self, score):
-        self._hash = None
         self._score += score
 
+    def applyAction(self, agentIndex, action):
+        """
+        Apply an action to this state in place (instead of creating a new successor state),
+        and return a token that can be passed to undo() to revert the action.
+        This lets deep searches (e.g. minimax) walk the game tree using a single state.
+
+        Tokens must be undone in the reverse order that they were created.
+        Successors generated while an action is applied are not affected by undoing it.
+        """
+
+        if (self.isOver()):
+            raise RuntimeError("Can't apply actions to a terminal state.")
+
+        token = self._getUndoToken()
+
+        self._markCopyOnWrite()
+        self._applySuccessorAction(agentIndex, action)
+
+        return token
+
     def eatCapsule(self, x, y):
         """
         Mark the capsule at the given location as eaten.
@@ -81,9 +136,10 @@ class AbstractGameState(abc.ABC):
             self._capsulesCopied = True
 
         self._capsules.remove((x, y))
+        self._capsuleBits &= ~(1 << (x * self._layout.height + y))
         self._lastCapsuleEaten = (x, y)
 
-        self._hash = None
+        self._boardHash ^= self._layout.getHashKeys().capsule(x, y)
         return True
 
     def eatFood(self, x, y):
@@ -98,17 +154,42 @@ class AbstractGameState(abc.ABC):
             self._food = self._food.copy()
             self._foodCopied = True
 
-        self._food[x][y] = False
+        self._food.set(x, y, False)
+        self._foodView = None
+
+        if (self._foodPositions is not None):
+            # The list may be shared with other states, so it is never modified in place.
+            index = bisect.bisect_left(self._foodPositions, (x, y))
+            self._foodPositions = self._foodPositions[:index] + self._foodPositions[(index + 1):]
         self._lastFoodEaten = (x, y)
+        self._numFood -= 1
 
-        self._hash = None
+        self._boardHash ^= self._layout.getHashKeys().food(x, y)
         return True
 
     def endGame(self, win):
         self._gameover = True
         self._win = win
 
-        self._hash = None
+    def generateSuccessors(self, agentIndex):
+        """
+        Yields (action, successor) pairs, one for each legal action of the agent
+        (in the same order as getLegalActions()).
+        This gives the same results as calling generateSuccessor() for each legal action,
+        but the legal actions are only computed once
+        (instead of again for each action to validate it).
+        Successors are generated lazily, so searches that prune (e.g. alpha-beta)
+        only pay for the successors they actually look at.
+        If the game is over, then there are no successors.
+        """
+
+        if (self.isOver()):
+            return
+
+        for action in self.getLegalActions(agentIndex):
+            successor = self._initSuccessor()
+            successor._applySuccessorAction(agentIndex, action, validate = False)
+            yield (action, successor)
 
     def getAgentPosition(self, index):
         """
@@ -125,9 +206,20 @@ class AbstractGameState(abc.ABC):
         return tuple(int(pos) for pos in position)
 
     def getAgentState(self, index):
+        """
+        Get the `pacai.core.agentstate.AgentState` for an agent.
+        Agent states may be shared with other game states, so the caller should not modify it.
+        Use getMutableAgentState() instead.
+        """
+
         return self._agentStates[index]
 
     def getAgentStates(self):
+        """
+        Get all the agent states.
+        See getAgentState(), the caller should not modify the list or states.
+        """
+
         return self._agentStates
 
     def getCapsules(self):
@@ -139,16 +231,53 @@ class AbstractGameState(abc.ABC):
 
     def getFood(self):
         """
-        Returns a Grid of boolean food indicator variables.
+        Returns a read-only Grid of boolean food indicator variables
+        (see `pacai.core.grid.ReadOnlyGrid`).
 
         Grids can be accessed via list notation.
         So to check if there is food at (x, y), just do something like: food[x][y].
 
-        Callers should favor hasFood() over this, since this will make a copy of the grid.
+        The returned grid shares its data with this state and cannot be modified,
+        use getFoodCopy() to get a grid that can be modified.
+        """
+
+        if (self._foodView is None):
+            self._foodView = ReadOnlyGrid(self._food)
+
+        return self._foodView
+
+    def getFoodCopy(self):
+        """
+        Returns a copy of the food grid (see getFood()) that the caller is free to modify.
         """
 
         return self._food.copy()
 
+    def getFoodPositions(self):
+        """
+        Get a list of the positions (x, y) of all the remaining food.
+        The list is sorted (by x and then y), is built the first time it is needed,
+        and is then kept up-to-date as food is eaten (so repeated calls are free).
+        The caller should not modify the list.
+        """
+
+        if (self._foodPositions is None):
+            self._foodPositions = self._food.asList()
+
+        return self._foodPositions
+
+    def getFoodPositionsByDistance(self, position):
+        """
+        Get the positions of all the remaining food ordered by their Manhattan distance
+        to the given position (closest first, ties broken by position).
+        Since Manhattan distance never overestimates the maze distance,
+        this is a good order to check candidates in when looking for the nearest food.
+        """
+
+        x, y = position
+        return sorted(self.getFoodPositions(),
+                key = lambda food: (abs(food[0] - x) + abs(food[1] - y), food))
+
     def getHighlightLocations(self):
         return self._highlightLocations
 
@@ -173,6 +302,19 @@ class AbstractGameState(abc.ABC):
     def getLastFoodEaten(self):
         return self._lastFoodEaten
 
+    def getMutableAgentState(self, index):
+        """
+        Get an agent state that is safe to modify.
+        Successors share agent states with the state they came from,
+        so the first time an agent state is modified in a successor it gets copied.
+        """
+
+        if (not self._agentStatesCopied[index]):
+            self._agentStates[index] = self._agentStates[index].copy()
+            self._agentStatesCopied[index] = True
+
+        return self._agentStates[index]
+
     def getNumAgents(self):
         return len(self._agentStates)
 
@@ -188,7 +330,7 @@ class AbstractGameState(abc.ABC):
         Get the amount of food left on the board.
         """
 
-        return self._food.count()
+        return self._numFood
 
     def getScore(self):
         return self._score
@@ -210,11 +352,15 @@ class AbstractGameState(abc.ABC):
         Returns true if the location (x, y) has a capsule.
         """
 
-        return (x, y) in self._capsules
+        if (x < 0 or y < 0 or x >= self._layout.width or y >= self._layout.height):
+            return False
+
+        return ((self._capsuleBits >> (x * self._layout.height + y)) & 1) == 1
 
     def hasFood(self, x, y):
         """
         Returns true if the location (x, y) has food.
+        Like grid[x][y], positions past the edge of the board raise an IndexError.
         """
 
         return self._food[x][y]
@@ -222,6 +368,7 @@ class AbstractGameState(abc.ABC):
     def hasWall(self, x, y):
         """
         Returns true if (x, y) has a wall, false otherwise.
+        Like grid[x][y], positions past the edge of the board raise an IndexError.
         """
 
         return self._layout.walls[x][y]
@@ -240,7 +387,28 @@ class AbstractGameState(abc.ABC):
 
     def setScore(self, score):
         self._score = score
-        self._hash = None
+
+    def undo(self, token):
+        """
+        Revert an action applied with applyAction().
+        """
+
+        self._restoreUndoToken(token)
+
+    def _getUndoToken(self):
+        """
+        Get everything that applying an action could change.
+        Children with their own mutable fields should extend this (and _restoreUndoToken()).
+
+        Food, capsules, and agent states are all copy on write,
+        so keeping a reference to the current ones is enough to restore them.
+        """
+
+        return (self._score, self._gameover, self._win, self._lastAgentMoved,
+                self._food, self._foodCopied, self._lastFoodEaten, self._numFood,
+                self._foodView, self._foodPositions,
+                self._capsules, self._capsulesCopied, self._lastCapsuleEaten, self._capsuleBits,
+                self._agentStates, self._agentStatesCopied, self._boardHash)
 
     def _initSuccessor(self):
         """
@@ -250,16 +418,33 @@ class AbstractGameState(abc.ABC):
 
         # Start with a shallow copy.
         successor = copy.copy(self)
-        successor._hash = None
+        successor._markCopyOnWrite()
+
+        return successor
+
+    def _markCopyOnWrite(self):
+        """
+        Mark all the data that may be shared with other states to be copied on write.
+        """
 
         # Leave food and capsules as a shallow copy, but mark them to be copied on write.
-        successor._foodCopied = False
-        successor._capsulesCopied = False
+        self._foodCopied = False
+        self._capsulesCopied = False
 
-        # Agent states need to be deep copied.
-        successor._agentStates = [agentState.copy() for agentState in self._agentStates]
+        # Share all the agent states, and mark them to be copied on write.
+        self._agentStates = self._agentStates.copy()
+        self._agentStatesCopied = [False] * len(self._agentStates)
 
-        return successor
+    def _restoreUndoToken(self, token):
+        """
+        Restore the values saved by _getUndoToken().
+        """
+
+        (self._score, self._gameover, self._win, self._lastAgentMoved,
+                self._food, self._foodCopied, self._lastFoodEaten, self._numFood,
+                self._foodView, self._foodPositions,
+                self._capsules, self._capsulesCopied, self._lastCapsuleEaten, self._capsuleBits,
+                self._agentStates, self._agentStatesCopied, self._boardHash) = token
 
     def __eq__(self, other):
         if (other is None):
@@ -288,8 +473,14 @@ class AbstractGameState(abc.ABC):
                 and self._layout == other._layout)
 
     def __hash__(self):
-        if (self._hash is None):
-            self._hash = util.buildHash(self._score, self._gameover, self._win, *self._capsules,
-                self._food, *self._agentStates, self._layout)
+        """
+        States are hashed using Zobrist hashing (see `pacai.core.zobrist`).
+        All the expensive parts of the hash (the board and agents) are maintained incrementally
+        as the state changes, so hashing a state is O(number of agents).
+        """
+
+        zobrist = self._boardHash
+        for agentState in self._agentStates:
+            zobrist ^= agentState.getZobristKey()
 
-        return self._hash
+        return util.buildHash(self._score, self._gameover, self._win, zobrist, self._layout)
@@ -1,8 +1,39 @@
+# int.bit_count() is only available in Python >= 3.10.
+if (hasattr(int, 'bit_count')):
+    countBits = int.bit_count
+else:
+    def countBits(bits):
+        """
+        Count the set bits in a (non-negative) int.
+        """
+
+        return bin(bits).count('1')
+
+def getBitIndexes(bits):
+    """
+    Get the indexes of all the set bits in a (non-negative) int (in increasing order).
+    Only the set bits are visited, so this is fast for sparse bitsets.
+    """
+
+    indexes = []
+    while (bits):
+        lowBit = bits & -bits
+        indexes.append(lowBit.bit_length() - 1)
+        bits ^= lowBit
+
+    return indexes
+
 class Grid:
     """
-    A 2-dimensional array of objects backed by a list of lists.
+    A 2-dimensional array of booleans backed by a packed bitset.
     Data is accessed via grid[x][y] where (x, y) are positions on a Pacman map with x horizontal,
     y vertical and the origin (0, 0) in the bottom left corner.
+
+    The cell (x, y) is stored in bit (x * height + y) of a single Python int.
+    This makes copying, counting, hashing, and comparing grids cheap,
+    since they all operate on the int directly instead of on each cell.
+    Grid.get() and Grid.set() skip the intermediate column object that grid[x] creates,
+    and should be preferred in performance sensitive code.
     """
 
     def __init__(self, width, height, initialValue = False):
@@ -11,74 +42,207 @@ class Grid:
 
         self._width = width
         self._height = height
-        self._data = [[initialValue for y in range(height)] for x in range(width)]
+
+        self._bits = 0
+        if (initialValue):
+            self._bits = self._fullMask()
 
     def asList(self, key = True):
-        values = []
+        """
+        Get the positions of all cells matching the key.
+        Positions are ordered by x and then by y.
+        """
 
-        for x in range(self._width):
-            for y in range(self._height):
-                if self[x][y] == key:
-                    values.append((x, y))
+        if (key):
+            bits = self._bits
+        else:
+            bits = self._bits ^ self._fullMask()
 
-        return values
+        return self._bitsToPositions(bits)
 
     def copy(self):
-        grid = Grid(self._width, self._height)
-        grid._data = [row.copy() for row in self._data]
+        grid = Grid.__new__(Grid)
+        grid._width = self._width
+        grid._height = self._height
+        grid._bits = self._bits
         return grid
 
-    def count(self, item =True):
-        return sum([x.count(item) for x in self._data])
+    def count(self, item = True):
+        ones = countBits(self._bits)
+
+        if (item):
+            return ones
+
+        return self._width * self._height - ones
 
     def deepCopy(self):
         return self.copy()
 
+    def get(self, x, y):
+        """
+        Get the value at (x, y).
+        Equivalent to grid[x][y] for in-bounds, non-negative positions.
+        There are no bounds checks (this is meant for hot loops over known positions),
+        use grid[x][y] for positions that may be out of bounds.
+        """
+
+        return ((self._bits >> (x * self._height + y)) & 1) == 1
+
+    def getBits(self):
+        """
+        Get the raw bitset backing this grid.
+        The cell (x, y) is bit (x * height + y).
+        """
+
+        return self._bits
+
     def getHeight(self):
         return self._height
 
     def getWidth(self):
         return self._width
 
+    def set(self, x, y, value):
+        """
+        Set the value at (x, y).
+        Equivalent to grid[x][y] = value for in-bounds, non-negative positions.
+        """
+
+        mask = 1 << (x * self._height + y)
+
+        if (value):
+            self._bits |= mask
+        else:
+            self._bits &= ~mask
+
+    def setBits(self, bits):
+        """
+        Replace the raw bitset backing this grid.
+        See Grid.getBits().
+        """
+
+        self._bits = bits & self._fullMask()
+
     def shallowCopy(self):
-        grid = Grid(self._width, self._height)
-        grid._data = self._data
-        return grid
+        """
+        Since the backing bitset is immutable, a shallow copy is the same as a full copy.
+        """
+
+        return self.copy()
+
+    def _bitsToPositions(self, bits):
+        height = self._height
+        return [divmod(index, height) for index in getBitIndexes(bits)]
 
     def _cellIndexToPosition(self, index):
-        x = index / self._height
+        x = index // self._height
         y = index % self._height
 
         return x, y
 
+    def _fullMask(self):
+        return (1 << (self._width * self._height)) - 1
+
+    def _normalizeX(self, x):
+        if (x < 0):
+            x += self._width
+
+        if (x < 0 or x >= self._width):
+            raise IndexError('Grid index out of range: %d.' % (x))
+
+        return x
+
+    def _normalizeY(self, y):
+        if (y < 0):
+            y += self._height
+
+        if (y < 0 or y >= self._height):
+            raise IndexError('Grid index out of range: %d.' % (y))
+
+        return y
+
     def __eq__(self, other):
-        if (other is None):
+        if (not isinstance(other, Grid)):
             return False
 
-        return self._data == other._data
+        return (self._bits == other._bits
+                and self._width == other._width
+                and self._height == other._height)
 
-    def __getitem__(self, i):
-        return self._data[i]
+    def __getitem__(self, x):
+        return _GridColumn(self, self._normalizeX(x))
 
     def __hash__(self):
-        hashcode = 0
-        base = 1
-
-        for row in self._data:
-            for value in row:
-                if (value):
-                    hashcode += base
-                base *= 2
-
-        return hash(hashcode)
+        return hash(self._bits)
 
     def __lt__(self, other):
         return self.__hash__() < other.__hash__()
 
-    def __setitem__(self, key, item):
-        self._data[key] = item
+    def __setitem__(self, x, column):
+        x = self._normalizeX(x)
+
+        values = list(column)
+        if (len(values) != self._height):
+            raise ValueError('Grid columns must have exactly %d values, found %d.'
+                    % (self._height, len(values)))
+
+        for y in range(self._height):
+            self.set(x, y, values[y])
 
     def __str__(self):
-        out = [[str(self._data[x][y])[0] for x in range(self._width)] for y in range(self._height)]
+        out = [[str(self.get(x, y))[0] for x in range(self._width)] for y in range(self._height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
+
+class _GridColumn:
+    """
+    A light view into a single column (fixed x) of a `Grid`.
+    This is what allows the classic grid[x][y] syntax (for both reading and writing).
+    """
+
+    __slots__ = ('_grid', '_x')
+
+    def __init__(self, grid, x):
+        self._grid = grid
+        self._x = x
+
+    def __getitem__(self, y):
+        grid = self._grid
+        return grid.get(self._x, grid._normalizeY(y))
+
+    def __iter__(self):
+        grid = self._grid
+        for y in range(grid._height):
+            yield grid.get(self._x, y)
+
+    def __len__(self):
+        return self._grid._height
+
+    def __setitem__(self, y, value):
+        grid = self._grid
+        grid.set(self._x, grid._normalizeY(y), value)
+
+class ReadOnlyGrid(Grid):
+    """
+    A grid that cannot be modified (trying to will raise a TypeError).
+    Since the bitset backing a grid is immutable, a read-only grid shares it with the grid
+    it was made from instead of copying any cells.
+    Use copy() to get a normal grid that can be modified.
+    """
+
+    def __init__(self, grid):
+        self._width = grid._width
+        self._height = grid._height
+        self._bits = grid._bits
+
+    # Override
+    def set(self, x, y, value):
+        raise TypeError('Read-only grids cannot be modified.')
+
+    # Override
+    def setBits(self, bits):
+        raise TypeError('Read-only grids cannot be modified.')
+
+    # Override
+    def __setitem__(self, x, column):
+        raise TypeError('Read-only grids cannot be modified.')
@@ -0,0 +1,201 @@
+"""
+Jump Point Search (JPS) for 4-connected grids where every move costs the same.
+
+In open areas, there are many equally short paths between two cells
+(any ordering of the same moves), and A* expands the cells along all of them.
+JPS only considers one ordering (move vertically first, then horizontally, and only turn from
+horizontal to vertical right past the corner of a wall).
+Instead of adding every cell to the fringe, it "jumps" in a straight line
+until it reaches a cell where the path could need to turn (a jump point),
+so only jump points are ever put in the fringe.
+
+See Harabor and Grastien, "Online Graph Pruning for Pathfinding on Grid Maps" (2011)
+for the original (8-connected) version.
+"""
+
+from pacai.core.actions import Actions
+from pacai.core.distance import manhattan
+from pacai.util.priorityQueue import IndexedPriorityQueue
+
+# The open cells for walls grids that have already been searched: {walls: {(x, y), ...}, ...}.
+_openCellsCache = {}
+
+HORIZONTAL_DIRECTIONS = ((1, 0), (-1, 0))
+ALL_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+def getActions(walls, start, goal):
+    """
+    Get the actions on a shortest path between two (int) positions.
+    Returns None if there is no path.
+    """
+
+    path = getPath(walls, start, goal)
+    if (path is None):
+        return None
+
+    actions = []
+    for i in range(1, len(path)):
+        vector = (path[i][0] - path[i - 1][0], path[i][1] - path[i - 1][1])
+        actions.append(Actions.vectorToDirection(vector))
+
+    return actions
+
+def getPath(walls, start, goal):
+    """
+    Get the cells on a shortest path between two (int) positions (including both ends).
+    Returns None if there is no path.
+    """
+
+    jumpPoints = getJumpPoints(walls, start, goal)
+    if (jumpPoints is None):
+        return None
+
+    path = [jumpPoints[0]]
+    for (x, y) in jumpPoints[1:]:
+        (previousX, previousY) = path[-1]
+        (dx, dy) = (_sign(x - previousX), _sign(y - previousY))
+
+        for i in range(manhattan((previousX, previousY), (x, y))):
+            path.append((path[-1][0] + dx, path[-1][1] + dy))
+
+    return path
+
+def getJumpPoints(walls, start, goal):
+    """
+    Get the jump points on a shortest path between two (int) positions (including both ends).
+    Each jump point is in a straight line from the one before it.
+    Returns None if there is no path.
+    """
+
+    openCells = _getOpenCells(walls)
+    if (start not in openCells or goal not in openCells):
+        return None
+
+    # {jump point: (previous jump point, direction from the previous jump point), ...}
+    parents = {start: (None, None)}
+    costs = {start: 0}
+    expanded = set()
+
+    fringe = IndexedPriorityQueue()
+    fringe.push(start, (manhattan(start, goal), 0))
+
+    while (not fringe.isEmpty()):
+        point = fringe.pop()
+
+        if (point == goal):
+            return _rebuildPath(parents, goal)
+
+        expanded.add(point)
+
+        for direction in _getDirections(openCells, point, parents[point][1]):
+            nextPoint = _jump(openCells, point, direction, goal)
+            if (nextPoint is None or nextPoint in expanded):
+                continue
+
+            cost = costs[point] + manhattan(point, nextPoint)
+            if (nextPoint in costs and costs[nextPoint] <= cost):
+                continue
+
+            costs[nextPoint] = cost
+            parents[nextPoint] = (point, direction)
+            fringe.update(nextPoint, (cost + manhattan(nextPoint, goal), -cost))
+
+    return None
+
+def _getDirections(openCells, point, direction):
+    """
+    Get the directions worth jumping in from a jump point that was reached going in a direction.
+    """
+
+    if (direction is None):
+        return ALL_DIRECTIONS
+
+    (x, y) = point
+    (dx, dy) = direction
+
+    # Vertical moves come first, so horizontal moves can go either way next.
+    if (dx == 0):
+        return ((0, dy), ) + HORIZONTAL_DIRECTIONS
+
+    # After a horizontal move, only turn when a wall was in the way of turning earlier.
+    directions = [direction]
+    for turnY in (1, -1):
+        if ((x, y + turnY) in openCells and (x - dx, y + turnY) not in openCells):
+            directions.append((0, turnY))
+
+    return directions
+
+def _getOpenCells(walls):
+    if (walls not in _openCellsCache):
+        _openCellsCache[walls.copy()] = frozenset(walls.asList(False))
+
+    return _openCellsCache[walls]
+
+def _jump(openCells, point, direction, goal):
+    if (direction[1] == 0):
+        return _jumpHorizontal(openCells, point, direction[0], goal)
+
+    return _jumpVertical(openCells, point, direction[1], goal)
+
+def _jumpHorizontal(openCells, point, dx, goal):
+    """
+    Move horizontally until reaching the goal or a cell right past the corner of a wall
+    (where the path may need to turn).
+    Returns None if a wall is reached first.
+    """
+
+    (x, y) = point
+
+    while (True):
+        x += dx
+
+        if ((x, y) not in openCells):
+            return None
+
+        if ((x, y) == goal):
+            return (x, y)
+
+        for turnY in (1, -1):
+            if ((x, y + turnY) in openCells and (x - dx, y + turnY) not in openCells):
+                return (x, y)
+
+def _jumpVertical(openCells, point, dy, goal):
+    """
+    Move vertically until reaching the goal or a cell where a horizontal jump finds a jump point.
+    Returns None if a wall is reached first.
+    """
+
+    (x, y) = point
+
+    while (True):
+        y += dy
+
+        if ((x, y) not in openCells):
+            return None
+
+        if ((x, y) == goal):
+            return (x, y)
+
+        for dx in (1, -1):
+            if (_jumpHorizontal(openCells, (x, y), dx, goal) is not None):
+                return (x, y)
+
+def _rebuildPath(parents, goal):
+    path = []
+
+    point = goal
+    while (point is not None):
+        path.append(point)
+        point = parents[point][0]
+
+    path.reverse()
+    return path
+
+def _sign(value):
+    if (value > 0):
+        return 1
+
+    if (value < 0):
+        return -1
+
+    return 0
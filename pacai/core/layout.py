@@ -1,35 +1,75 @@
+import json
 import os
 import random
 
+from pacai.core.actions import MoveTable
 from pacai.core.distance import manhattan
 from pacai.core.grid import Grid
+from pacai.core.zobrist import ZobristKeys
 
 # By default, the layout directory is adjacent to this file.
 DEFAULT_LAYOUT_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'layouts')
 
 GHOST_NUMS = ['1', '2', '3', '4']
 
+LAYOUT_EXTENSION = '.lay'
+COMPILED_LAYOUT_EXTENSION = '.layc'
+COMPILED_LAYOUT_VERSION = 2
+
+# Layouts that have already been loaded: {(path, mtime, maxGhosts): Layout, ...}.
+# Layouts are never modified by games, so all games can share the same instance.
+_layoutCache = {}
+
 class Layout(object):
     """
     A Layout manages the static information about the game board.
     """
 
     def __init__(self, layoutText, maxGhosts = None):
-        self.width = len(layoutText[0])
-        self.height = len(layoutText)
-        self.walls = Grid(self.width, self.height, initialValue = False)
-        self.food = Grid(self.width, self.height, initialValue = False)
-        self.capsules = []
-        self.agentPositions = []
-        self.numGhosts = 0
-        self.layoutText = layoutText
-
+        self._initEmpty(len(layoutText[0]), len(layoutText), layoutText)
         self.processLayoutText(layoutText, maxGhosts)
 
+    @property
+    def layoutText(self):
+        """
+        The rows of the layout's text (top row first).
+        Compiled layouts do not store their text, so it is rebuilt the first time it is needed.
+        """
+
+        if (self._layoutText is None):
+            self._layoutText = self._buildLayoutText()
+
+        return self._layoutText
+
+    def getHashKeys(self):
+        """
+        Get the `pacai.core.zobrist.ZobristKeys` used to hash game states on this layout.
+        """
+
+        if (self._hashKeys is None):
+            self._hashKeys = ZobristKeys(self.width, self.height)
+
+        return self._hashKeys
+
+    def getMoveTable(self):
+        """
+        Get the `pacai.core.actions.MoveTable` for this layout's walls.
+        """
+
+        if (self._moveTable is None):
+            self._moveTable = MoveTable(self.walls)
+
+        return self._moveTable
+
     def getNumGhosts(self):
         return self.numGhosts
 
     def isWall(self, pos):
+        """
+        Returns true if pos has a wall, false otherwise.
+        Like walls[x][y], positions past the edge of the board raise an IndexError.
+        """
+
         x, col = pos
         return self.walls[x][col]
 
@@ -76,7 +116,16 @@ class Layout(object):
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        layout = Layout.__new__(Layout)
+        layout._initEmpty(self.width, self.height, self.layoutText[:])
+
+        layout.walls = self.walls.copy()
+        layout.food = self.food.copy()
+        layout.capsules = self.capsules.copy()
+        layout.agentPositions = self.agentPositions.copy()
+        layout.numGhosts = self.numGhosts
+
+        return layout
 
     def processLayoutText(self, layoutText, maxGhosts):
         """
@@ -99,14 +148,23 @@ class Layout(object):
             for x in range(self.width):
                 layoutChar = layoutText[maxY - y][x]
                 self.processLayoutChar(x, y, layoutChar, maxGhosts)
+
+        self._finishAgentPositions()
+
+    def _finishAgentPositions(self):
+        """
+        Order the agents found by processLayoutChar() by their number
+        and replace their number with whether or not they are a pacman.
+        """
+
         self.agentPositions.sort()
         self.agentPositions = [(i == 0, pos) for i, pos in self.agentPositions]
 
     def processLayoutChar(self, x, y, layoutChar, maxGhosts):
         if (layoutChar == '%'):
-            self.walls[x][y] = True
+            self.walls.set(x, y, True)
         elif (layoutChar == '.'):
-            self.food[x][y] = True
+            self.food.set(x, y, True)
         elif (layoutChar == 'o'):
             self.capsules.append((x, y))
         elif (layoutChar == 'P'):
@@ -118,14 +176,156 @@ class Layout(object):
             self.agentPositions.append((int(layoutChar), (x, y)))
             self.numGhosts += 1
 
-def getLayout(name, layout_dir = DEFAULT_LAYOUT_DIR, maxGhosts = None):
-    if (not name.endswith('.lay')):
-        name += '.lay'
+    def _buildLayoutText(self):
+        rows = [[' '] * self.width for y in range(self.height)]
+
+        maxY = self.height - 1
+        for (x, y) in self.walls.asList():
+            rows[maxY - y][x] = '%'
+
+        for (x, y) in self.food.asList():
+            rows[maxY - y][x] = '.'
+
+        for (x, y, layoutChar) in self._objects:
+            rows[maxY - y][x] = layoutChar
+
+        return [''.join(row) for row in rows]
+
+    def _initEmpty(self, width, height, layoutText = None):
+        self.width = width
+        self.height = height
+        self.walls = Grid(self.width, self.height, initialValue = False)
+        self.food = Grid(self.width, self.height, initialValue = False)
+        self.capsules = []
+        self.agentPositions = []
+        self.numGhosts = 0
+
+        # Compiled layouts leave the text empty and keep their objects (see compileLayout())
+        # to rebuild it from.
+        self._layoutText = layoutText
+        self._objects = []
+
+        # Built on demand, see getHashKeys() and getMoveTable().
+        self._hashKeys = None
+        self._moveTable = None
+
+def getLayout(name, layout_dir = DEFAULT_LAYOUT_DIR, maxGhosts = None, compiled = False):
+    """
+    Load a layout by name.
+    Names may refer to either a text layout (.lay, the default) or a compiled layout (.layc).
+    If compiled is True and a text layout has an up-to-date compiled layout next to it,
+    then the compiled layout will be used instead.
+
+    Loaded layouts are cached for the life of the process,
+    so the same (unmodified) layout is only ever loaded once.
+    Callers should not modify the returned layout.
+    """
+
+    if (not name.endswith(LAYOUT_EXTENSION) and not name.endswith(COMPILED_LAYOUT_EXTENSION)):
+        name += LAYOUT_EXTENSION
 
     path = os.path.join(layout_dir, name)
     if (not os.path.isfile(path)):
         raise Exception("Could not locate layout file: '%s'." % (path))
 
+    compiledPath = os.path.splitext(path)[0] + COMPILED_LAYOUT_EXTENSION
+    if (path != compiledPath and compiled and os.path.isfile(compiledPath)
+            and os.path.getmtime(compiledPath) >= os.path.getmtime(path)):
+        path = compiledPath
+
+    key = (os.path.realpath(path), os.path.getmtime(path), maxGhosts)
+    if (key in _layoutCache):
+        return _layoutCache[key]
+
+    if (path == compiledPath):
+        layout = loadCompiledLayout(path, maxGhosts)
+    else:
+        layout = Layout(_readLayoutText(path), maxGhosts)
+
+    _layoutCache[key] = layout
+    return layout
+
+def compileLayout(layout, path):
+    """
+    Write a layout to a compiled layout file.
+    Compiled layouts are JSON that store the walls and food as bitsets (in hex),
+    and the remaining objects (capsules and agents) as a short list,
+    so they can be loaded without parsing the layout character by character.
+    Derived tables (like the move table) are rebuilt when they are first needed.
+    """
+
+    # All the characters that are not walls, food, or empty space (in the order they are read).
+    # Agents are kept as characters since which ghosts are used depends on maxGhosts.
+    objects = []
+    maxY = layout.height - 1
+    for y in range(layout.height):
+        for x in range(layout.width):
+            layoutChar = layout.layoutText[maxY - y][x]
+            if (layoutChar not in ['%', '.', ' ']):
+                objects.append([x, y, layoutChar])
+
+    data = {
+        'version': COMPILED_LAYOUT_VERSION,
+        'width': layout.width,
+        'height': layout.height,
+        'walls': '%x' % (layout.walls.getBits()),
+        'food': '%x' % (layout.food.getBits()),
+        'objects': objects,
+    }
+
+    with open(path, 'w') as file:
+        json.dump(data, file)
+
+def loadCompiledLayout(path, maxGhosts = None):
+    """
+    Load a layout written by compileLayout().
+    Raises a ValueError if the file is not a valid compiled layout.
+    """
+
+    with open(path, 'r') as file:
+        data = json.load(file)
+
+    if (not isinstance(data, dict) or data.get('version') != COMPILED_LAYOUT_VERSION):
+        raise ValueError("Unsupported compiled layout in '%s'." % (path))
+
+    width = data.get('width')
+    height = data.get('height')
+    objects = data.get('objects')
+
+    if (not isinstance(width, int) or not isinstance(height, int) or width <= 0 or height <= 0
+            or not isinstance(objects, list)):
+        raise ValueError("Invalid compiled layout in '%s'." % (path))
+
+    layout = Layout.__new__(Layout)
+    layout._initEmpty(width, height)
+
+    layout.walls.setBits(_parseBits(data.get('walls'), path))
+    layout.food.setBits(_parseBits(data.get('food'), path))
+
+    for item in objects:
+        if (not isinstance(item, list) or len(item) != 3):
+            raise ValueError("Invalid compiled layout object (%s) in '%s'." % (item, path))
+
+        (x, y, layoutChar) = item
+        if (not isinstance(x, int) or not isinstance(y, int) or x < 0 or x >= width
+                or y < 0 or y >= height or not isinstance(layoutChar, str)
+                or len(layoutChar) != 1):
+            raise ValueError("Invalid compiled layout object (%s) in '%s'." % (item, path))
+
+        layout._objects.append((x, y, layoutChar))
+        layout.processLayoutChar(x, y, layoutChar, maxGhosts)
+
+    layout._finishAgentPositions()
+
+    return layout
+
+def _parseBits(text, path):
+    try:
+        return int(text, 16)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid compiled layout bits (%s) in '%s'." % (text, path))
+
+def _readLayoutText(path):
     rows = []
     with open(path, 'r') as file:
         for line in file:
@@ -133,4 +333,4 @@ def getLayout(name, layout_dir = DEFAULT_LAYOUT_DIR, maxGhosts = None):
             if (line != ''):
                 rows.append(line)
 
-    return Layout(rows, maxGhosts)
+    return rows
@@ -0,0 +1,374 @@
+"""
+A contracted graph of a maze.
+
+Pacman mazes are mostly one-wide corridors.
+Instead of looking at every cell, a `MazeGraph` only keeps the cells where something interesting
+happens (junctions and dead ends, the "nodes") and joins them with weighted edges
+(the corridors between them).
+Any other cell is just some offset along a corridor,
+so distances and paths between any two cells can be found from the (much smaller) node graph.
+"""
+
+import heapq
+import sys
+
+from pacai.core.actions import Actions
+
+# Graphs that have already been built: {walls: MazeGraph, ...}.
+_graphCache = {}
+
+class Corridor(object):
+    """
+    A chain of cells (each with exactly two open neighbors) between two nodes.
+    The corridor's cells are ordered from the start node to the end node (not including them).
+    The start and end node are the same for corridors that loop back around.
+    """
+
+    def __init__(self, start, end, cells):
+        self.start = start
+        self.end = end
+        self.cells = cells
+        self.length = len(cells) + 1
+
+class MazeGraph(object):
+    """
+    A maze contracted into nodes (junctions and dead ends) and corridors (weighted edges).
+    Cells that are not nodes are located by their corridor and offset
+    (the distance from the corridor's start node).
+
+    Distances between all pairs of nodes are computed up front,
+    so the distance between any two cells is the best of (at most) four combinations of
+    the nodes at the ends of their corridors.
+    This class can be used anywhere a `pacai.core.distanceCalculator.DistanceMatrix` can.
+    """
+
+    def __init__(self, walls):
+        self._walls = walls
+
+        # {(x, y): ((x, y), ...), ...}
+        neighbors = self._findNeighbors(walls)
+
+        # Nodes are the cells with any number of neighbors other than two.
+        self.nodes = [cell for (cell, adjacent) in neighbors.items() if (len(adjacent) != 2)]
+        self._nodeIndexes = {node: index for (index, node) in enumerate(self.nodes)}
+
+        self.corridors = []
+
+        # {node index: [(neighbor node index, length, corridor index), ...], ...}
+        self._edges = []
+
+        self._buildCorridors(neighbors)
+
+        # For every cell: ((node index, distance to node, corridor side), ...).
+        # The side is 0 if the node is the start of the cell's corridor, 1 if it is the end,
+        # and None if the cell is the node itself.
+        self._anchors = {}
+
+        # For every corridor cell: (corridor index, offset).
+        self._locations = {}
+
+        for (index, node) in enumerate(self.nodes):
+            self._anchors[node] = ((index, 0, None), )
+
+        for (corridorIndex, corridor) in enumerate(self.corridors):
+            for (i, cell) in enumerate(corridor.cells):
+                offset = i + 1
+                self._locations[cell] = (corridorIndex, offset)
+                self._anchors[cell] = ((corridor.start, offset, 0),
+                        (corridor.end, corridor.length - offset, 1))
+
+        self._computeNodeDistances()
+
+    def getActions(self, pos1, pos2):
+        """
+        Get the actions on a shortest path between two positions.
+        Returns None if there is no path.
+        """
+
+        path = self.getPath(pos1, pos2)
+        if (path is None):
+            return None
+
+        actions = []
+        for i in range(1, len(path)):
+            vector = (path[i][0] - path[i - 1][0], path[i][1] - path[i - 1][1])
+            actions.append(Actions.vectorToDirection(vector))
+
+        return actions
+
+    def getCorridor(self, position):
+        """
+        Get the corridor a (non-node) position is in and its offset in that corridor:
+        (`Corridor`, offset).
+        Returns None for nodes.
+        """
+
+        if (position not in self._locations):
+            return None
+
+        corridorIndex, offset = self._locations[position]
+        return (self.corridors[corridorIndex], offset)
+
+    def getDistance(self, pos1, pos2):
+        """
+        Get the distance between two (int) positions.
+        Raises a KeyError if either position is not an open cell.
+        If there is no path between the positions, then sys.maxsize is returned.
+        """
+
+        return self._getBestRoute(pos1, pos2)[0]
+
+    def getDistancesFrom(self, source, targets):
+        """
+        Get the distances from one (int) position to a list of (int) positions.
+        See getDistance().
+        """
+
+        return [self._getBestRoute(source, target)[0] for target in targets]
+
+    def getNumNodes(self):
+        return len(self.nodes)
+
+    def getPath(self, pos1, pos2):
+        """
+        Get the cells on a shortest path between two positions (including both ends).
+        Returns None if there is no path.
+        """
+
+        distance, route = self._getBestRoute(pos1, pos2)
+        if (distance == sys.maxsize):
+            return None
+
+        if (route is None):
+            # Both positions are in the same corridor.
+            (corridorIndex, offset1) = self._locations[pos1]
+            (corridorIndex, offset2) = self._locations[pos2]
+            cells = self._corridorPath(corridorIndex)
+
+            if (offset1 <= offset2):
+                return cells[offset1:(offset2 + 1)]
+
+            return cells[offset2:(offset1 + 1)][::-1]
+
+        (anchor1, anchor2) = route
+
+        path = self._pathToAnchor(pos1, anchor1)
+        path += self._nodePath(anchor1[0], anchor2[0])[1:]
+        path += self._pathToAnchor(pos2, anchor2)[::-1][1:]
+
+        return path
+
+    def isNode(self, position):
+        return position in self._nodeIndexes
+
+    def _buildCorridors(self, neighbors):
+        self._edges = [[] for node in self.nodes]
+
+        # (node, first cell) pairs that have already been walked.
+        walked = set()
+
+        nodeIndex = 0
+        while (True):
+            # Any cells left once all the nodes are done are in loops without any nodes.
+            # Make one cell of the loop a node, and the rest of the loop becomes a corridor.
+            if (nodeIndex == len(self.nodes)):
+                inCorridors = {cell for corridor in self.corridors for cell in corridor.cells}
+                loopCells = [cell for cell in neighbors
+                        if (cell not in self._nodeIndexes and cell not in inCorridors)]
+
+                if (len(loopCells) == 0):
+                    break
+
+                self._nodeIndexes[loopCells[0]] = len(self.nodes)
+                self.nodes.append(loopCells[0])
+                self._edges.append([])
+
+            node = self.nodes[nodeIndex]
+
+            for cell in neighbors[node]:
+                if ((node, cell) in walked):
+                    continue
+
+                cells = []
+                previous = node
+
+                while (cell not in self._nodeIndexes):
+                    cells.append(cell)
+                    (first, second) = neighbors[cell]
+
+                    if (first == previous):
+                        previous, cell = cell, second
+                    else:
+                        previous, cell = cell, first
+
+                walked.add((node, (cells + [cell])[0]))
+                walked.add((cell, ([node] + cells)[-1]))
+
+                start = self._nodeIndexes[node]
+                end = self._nodeIndexes[cell]
+
+                corridorIndex = len(self.corridors)
+                self.corridors.append(Corridor(start, end, cells))
+
+                self._edges[start].append((end, len(cells) + 1, corridorIndex))
+                if (start != end):
+                    self._edges[end].append((start, len(cells) + 1, corridorIndex))
+
+            nodeIndex += 1
+
+    def _computeNodeDistances(self):
+        """
+        Run Dijkstra's algorithm from every node.
+        Also keep the previous (node, corridor) for every node, so paths can be rebuilt.
+        """
+
+        numNodes = len(self.nodes)
+
+        self._nodeDistances = [sys.maxsize] * (numNodes * numNodes)
+        self._nodeParents = []
+
+        for source in range(numNodes):
+            offset = source * numNodes
+            parents = [None] * numNodes
+
+            self._nodeDistances[offset + source] = 0
+            queue = [(0, source)]
+
+            while (len(queue) > 0):
+                distance, node = heapq.heappop(queue)
+                if (distance > self._nodeDistances[offset + node]):
+                    continue
+
+                for (neighbor, length, corridorIndex) in self._edges[node]:
+                    newDistance = distance + length
+                    if (newDistance < self._nodeDistances[offset + neighbor]):
+                        self._nodeDistances[offset + neighbor] = newDistance
+                        parents[neighbor] = (node, corridorIndex)
+                        heapq.heappush(queue, (newDistance, neighbor))
+
+            self._nodeParents.append(parents)
+
+    def _corridorPath(self, corridorIndex):
+        """
+        Get all the cells of a corridor, including the nodes at each end.
+        A cell's offset in the corridor is its index in this list.
+        """
+
+        corridor = self.corridors[corridorIndex]
+        return [self.nodes[corridor.start]] + corridor.cells + [self.nodes[corridor.end]]
+
+    def _findNeighbors(self, walls):
+        width = walls.getWidth()
+        height = walls.getHeight()
+
+        neighbors = {}
+        for (x, y) in walls.asList(False):
+            adjacent = []
+            for (nextX, nextY) in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]:
+                if (nextX < 0 or nextX >= width or nextY < 0 or nextY >= height):
+                    continue
+
+                if (not walls.get(nextX, nextY)):
+                    adjacent.append((nextX, nextY))
+
+            neighbors[(x, y)] = tuple(adjacent)
+
+        return neighbors
+
+    def _getBestRoute(self, pos1, pos2):
+        """
+        Get the shortest distance between two positions and how to get it:
+        (distance, (anchor1, anchor2)).
+        The route is None when the positions are in the same corridor and
+        the best path stays inside the corridor.
+        """
+
+        anchors1 = self._anchors[pos1]
+        anchors2 = self._anchors[pos2]
+
+        numNodes = len(self.nodes)
+        nodeDistances = self._nodeDistances
+
+        bestDistance = sys.maxsize
+        bestRoute = None
+
+        for anchor1 in anchors1:
+            offset = anchor1[0] * numNodes
+            for anchor2 in anchors2:
+                nodeDistance = nodeDistances[offset + anchor2[0]]
+                if (nodeDistance == sys.maxsize):
+                    continue
+
+                distance = anchor1[1] + nodeDistance + anchor2[1]
+                if (distance < bestDistance):
+                    bestDistance = distance
+                    bestRoute = (anchor1, anchor2)
+
+        location1 = self._locations.get(pos1)
+        location2 = self._locations.get(pos2)
+
+        if (location1 is not None and location2 is not None and location1[0] == location2[0]):
+            distance = abs(location1[1] - location2[1])
+            if (distance <= bestDistance):
+                return (distance, None)
+
+        return (bestDistance, bestRoute)
+
+    def _nodePath(self, start, end):
+        """
+        Get the cells on a shortest path between two nodes (given by index).
+        """
+
+        parents = self._nodeParents[start]
+
+        hops = []
+        node = end
+        while (node != start):
+            previous, corridorIndex = parents[node]
+            hops.append((previous, corridorIndex))
+            node = previous
+
+        path = [self.nodes[start]]
+        for (previous, corridorIndex) in reversed(hops):
+            cells = self._corridorPath(corridorIndex)
+            if (self.corridors[corridorIndex].start != previous):
+                cells.reverse()
+
+            path += cells[1:]
+
+        return path
+
+    def _pathToAnchor(self, position, anchor):
+        """
+        Get the cells from a position to one of its anchor nodes (including both).
+        """
+
+        (nodeIndex, distance, side) = anchor
+        if (side is None):
+            return [position]
+
+        corridorIndex, offset = self._locations[position]
+        cells = self._corridorPath(corridorIndex)
+
+        if (side == 0):
+            return cells[offset::-1]
+
+        return cells[offset:]
+
+    def __contains__(self, pair):
+        """
+        Check if there is a distance for a pair of positions, e.g. ((1, 1), (2, 1)) in graph.
+        """
+
+        return pair[0] in self._anchors and pair[1] in self._anchors
+
+def getMazeGraph(walls):
+    """
+    Get the `MazeGraph` for a walls grid.
+    Graphs are cached, so each maze is only contracted once.
+    """
+
+    if (walls not in _graphCache):
+        _graphCache[walls.copy()] = MazeGraph(walls)
+
+    return _graphCache[walls]
@@ -0,0 +1,415 @@
+"""
+Reusable implementations of the standard graph search algorithms.
+
+Every search node keeps a pointer to its parent (instead of a copy of the entire path),
+so pushing a node costs the same no matter how deep it is.
+The path is only rebuilt (by following the parent pointers) once a goal is found.
+
+All the searches take a `pacai.core.search.problem.SearchProblem` and return a list of actions
+that reaches a goal (or None if there is no such path), just like `pacai.student.search`.
+
+The bidirectional searches search forwards from the start and backwards from the goal at the
+same time (until the two searches meet), so they only work on problems with a single goal state
+that also implement goalState() and predecessorStates()
+(see `pacai.core.search.problem.SearchProblem`).
+`pacai.core.search.position.PositionSearchProblem` is one such problem.
+Giving them any other problem (or one whose goalState() is None) raises a ValueError.
+"""
+
+import collections
+import math
+
+from pacai.util.priorityQueue import IndexedPriorityQueue
+
+class SearchNode(object):
+    """
+    A state reached during a search, along with how it was reached.
+    """
+
+    __slots__ = ('state', 'parent', 'action', 'cost')
+
+    def __init__(self, state, parent = None, action = None, cost = 0):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+
+    def getActions(self):
+        """
+        Get the actions that lead from the starting state to this node.
+        """
+
+        actions = []
+
+        node = self
+        while (node.parent is not None):
+            if (isinstance(node.action, list)):
+                # Some problems use a list of actions as a single step.
+                actions.extend(reversed(node.action))
+            else:
+                actions.append(node.action)
+
+            node = node.parent
+
+        actions.reverse()
+        return actions
+
+class _BackwardProblem(object):
+    """
+    A view of a search problem from its goal.
+    This is what a heuristic sees when a bidirectional search is searching backwards,
+    so heuristics that estimate the distance to `problem.goal` estimate the distance to the start.
+    Everything else comes from the original problem.
+    """
+
+    def __init__(self, problem):
+        self._problem = problem
+        self.goal = problem.startingState()
+
+    def isGoal(self, state):
+        return state == self.goal
+
+    def startingState(self):
+        return self._problem.goalState()
+
+    def successorStates(self, state):
+        return self._problem.predecessorStates(state)
+
+    def __getattr__(self, name):
+        return getattr(self._problem, name)
+
+def bidirectionalAStarSearch(problem, heuristic):
+    """
+    Search forwards from the start and backwards from the goal,
+    each time from the side with the fewest nodes in its fringe.
+    The heuristic must be consistent.
+
+    When searching backwards, the heuristic is given a view of the problem where the start is
+    the goal (so `problem.goal` is the starting state).
+    Each side uses the average of the two estimates (see _bidirectionalBestFirstSearch()),
+    which keeps both sides consistent with each other.
+    """
+
+    return _bidirectionalBestFirstSearch(problem, heuristic)
+
+def bidirectionalBreadthFirstSearch(problem):
+    """
+    Search the shallowest nodes forwards from the start and backwards from the goal,
+    a full layer at a time from the side with the smaller layer.
+    """
+
+    goal = _getBidirectionalGoal(problem)
+    start = problem.startingState()
+
+    if (start == goal):
+        return []
+
+    # {state: (previous state, action, depth), ...}
+    # Going backwards, the previous state is the next state on the way to the goal.
+    forwardParents = {start: (None, None, 0)}
+    backwardParents = {goal: (None, None, 0)}
+
+    forwardLayer = [start]
+    backwardLayer = [goal]
+
+    while (len(forwardLayer) > 0 and len(backwardLayer) > 0):
+        if (len(forwardLayer) <= len(backwardLayer)):
+            forwardLayer, meeting = _expandLayer(forwardLayer, forwardParents, backwardParents,
+                    problem.successorStates)
+        else:
+            backwardLayer, meeting = _expandLayer(backwardLayer, backwardParents, forwardParents,
+                    problem.predecessorStates)
+
+        if (meeting is not None):
+            return _joinPaths(meeting, forwardParents, backwardParents)
+
+    return None
+
+def bidirectionalUniformCostSearch(problem):
+    """
+    Search the node of least total cost forwards from the start and backwards from the goal.
+    """
+
+    return _bidirectionalBestFirstSearch(problem, None)
+
+def depthFirstSearch(problem):
+    """
+    Search the deepest nodes in the search tree first.
+    """
+
+    fringe = [SearchNode(problem.startingState())]
+    reached = set()
+
+    while (len(fringe) > 0):
+        node = fringe.pop()
+
+        if (problem.isGoal(node.state)):
+            return node.getActions()
+
+        if (node.state in reached):
+            continue
+
+        reached.add(node.state)
+
+        for (state, action, cost) in problem.successorStates(node.state):
+            if (state not in reached):
+                fringe.append(SearchNode(state, node, action, node.cost + cost))
+
+    return None
+
+def breadthFirstSearch(problem):
+    """
+    Search the shallowest nodes in the search tree first.
+    A state is only ever added to the fringe once (the first time it is seen).
+    """
+
+    start = SearchNode(problem.startingState())
+
+    fringe = collections.deque([start])
+    seen = {start.state}
+
+    while (len(fringe) > 0):
+        node = fringe.popleft()
+
+        if (problem.isGoal(node.state)):
+            return node.getActions()
+
+        for (state, action, cost) in problem.successorStates(node.state):
+            if (state not in seen):
+                seen.add(state)
+                fringe.append(SearchNode(state, node, action, node.cost + cost))
+
+    return None
+
+def uniformCostSearch(problem):
+    """
+    Search the node of least total cost first.
+    """
+
+    return _bestFirstSearch(problem, None)
+
+def aStarSearch(problem, heuristic):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+    """
+
+    return _bestFirstSearch(problem, heuristic)
+
+def _bestFirstSearch(problem, heuristic):
+    """
+    The shared implementation of UCS (no heuristic) and A*.
+
+    Each state is in the fringe at most once.
+    When a cheaper path to a state that is already in the fringe is found,
+    the state's priority is lowered instead of the state being pushed again.
+    Ties between states with the same priority go to the one with the higher cost
+    (the one closer to a goal according to the heuristic), and then to the one pushed first.
+    So states are never compared to each other (and do not need to be orderable).
+    """
+
+    start = SearchNode(problem.startingState())
+
+    priority = 0
+    if (heuristic is not None):
+        priority = heuristic(start.state, problem)
+
+    fringe = IndexedPriorityQueue()
+    fringe.push(start.state, (priority, 0))
+
+    # The best node found so far for each state: {state: SearchNode, ...}.
+    nodes = {start.state: start}
+    expanded = set()
+
+    while (not fringe.isEmpty()):
+        node = nodes[fringe.pop()]
+
+        if (problem.isGoal(node.state)):
+            return node.getActions()
+
+        expanded.add(node.state)
+
+        for (state, action, cost) in problem.successorStates(node.state):
+            if (state in expanded):
+                continue
+
+            childCost = node.cost + cost
+            if (state in nodes and nodes[state].cost <= childCost):
+                continue
+
+            nodes[state] = SearchNode(state, node, action, childCost)
+
+            priority = childCost
+            if (heuristic is not None):
+                priority += heuristic(state, problem)
+
+            fringe.update(state, (priority, -childCost))
+
+    return None
+
+def _bidirectionalBestFirstSearch(problem, heuristic):
+    """
+    The shared implementation of bidirectional UCS (no heuristic) and A*.
+
+    Both sides use the same potential: p(state) = (forward estimate - backward estimate) / 2.
+    The forward side orders states by cost + p(state) and the backward side by cost - p(state).
+    Searching is done once the best fringe priorities of the two sides add up to
+    (at least) the cost of the best path found so far,
+    since no path through either fringe could be any cheaper.
+    """
+
+    goal = _getBidirectionalGoal(problem)
+    start = problem.startingState()
+
+    if (start == goal):
+        return []
+
+    backwardProblem = _BackwardProblem(problem)
+
+    # {state: potential, ...}
+    potentials = {}
+
+    def potential(state):
+        if (heuristic is None):
+            return 0
+
+        if (state not in potentials):
+            potentials[state] = (heuristic(state, problem)
+                    - heuristic(state, backwardProblem)) / 2
+
+        return potentials[state]
+
+    # Each side is: [fringe, {state: cost, ...}, {state: (previous state, action), ...},
+    #   expanded states, next states function, potential sign].
+    forward = [IndexedPriorityQueue(), {start: 0}, {start: (None, None)}, set(),
+            problem.successorStates, 1]
+    backward = [IndexedPriorityQueue(), {goal: 0}, {goal: (None, None)}, set(),
+            problem.predecessorStates, -1]
+
+    forward[0].push(start, potential(start))
+    backward[0].push(goal, -potential(goal))
+
+    bestCost = math.inf
+    meeting = None
+
+    while (not forward[0].isEmpty() and not backward[0].isEmpty()):
+        if (forward[0].peek()[1] + backward[0].peek()[1] >= bestCost):
+            break
+
+        if (len(forward[0]) <= len(backward[0])):
+            (side, other) = (forward, backward)
+        else:
+            (side, other) = (backward, forward)
+
+        (fringe, costs, parents, expanded, nextStates, sign) = side
+        otherCosts = other[1]
+
+        state = fringe.pop()
+        expanded.add(state)
+
+        for (child, action, cost) in nextStates(state):
+            if (child in expanded):
+                continue
+
+            childCost = costs[state] + cost
+            if (child not in costs or childCost < costs[child]):
+                costs[child] = childCost
+                parents[child] = (state, action)
+                fringe.update(child, childCost + sign * potential(child))
+
+            if (child in otherCosts and costs[child] + otherCosts[child] < bestCost):
+                bestCost = costs[child] + otherCosts[child]
+                meeting = child
+
+    if (meeting is None):
+        return None
+
+    return _joinPaths(meeting, forward[2], backward[2])
+
+def _getBidirectionalGoal(problem):
+    """
+    Make sure that a problem can be searched backwards (before any searching is done)
+    and get its goal state.
+    """
+
+    for name in ['goalState', 'predecessorStates']:
+        if (not callable(getattr(problem, name, None))):
+            raise ValueError("Bidirectional search needs a problem with a %s() method, %s has none."
+                    % (name, type(problem).__name__))
+
+    goal = problem.goalState()
+    if (goal is None):
+        raise ValueError("Bidirectional search needs a single goal state, %s has none."
+                % (type(problem).__name__))
+
+    return goal
+
+def _expandLayer(layer, parents, otherParents, nextStates):
+    """
+    Expand every state in a layer of a bidirectional BFS.
+    Returns the next layer and the state (if any) where this side met the other side
+    on the shortest path.
+    """
+
+    nextLayer = []
+
+    meeting = None
+    bestDepth = None
+
+    for state in layer:
+        depth = parents[state][2] + 1
+
+        for (child, action, cost) in nextStates(state):
+            if (child in parents):
+                continue
+
+            parents[child] = (state, action, depth)
+            nextLayer.append(child)
+
+            if (child in otherParents):
+                totalDepth = depth + otherParents[child][2]
+                if (bestDepth is None or totalDepth < bestDepth):
+                    bestDepth = totalDepth
+                    meeting = child
+
+    return (nextLayer, meeting)
+
+def _joinPaths(meeting, forwardParents, backwardParents):
+    """
+    Get the actions from the start to the meeting state (following the forward parents),
+    and then from the meeting state to the goal (following the backward parents).
+    """
+
+    actions = []
+
+    state = meeting
+    while (forwardParents[state][0] is not None):
+        _addAction(actions, forwardParents[state][1], True)
+        state = forwardParents[state][0]
+
+    actions.reverse()
+
+    state = meeting
+    while (backwardParents[state][0] is not None):
+        _addAction(actions, backwardParents[state][1], False)
+        state = backwardParents[state][0]
+
+    return actions
+
+def _addAction(actions, action, reverse):
+    # Some problems use a list of actions as a single step.
+    if (not isinstance(action, list)):
+        actions.append(action)
+    elif (reverse):
+        actions.extend(reversed(action))
+    else:
+        actions.extend(action)
+
+# Abbreviations
+
+bfs = breadthFirstSearch
+dfs = depthFirstSearch
+astar = aStarSearch
+ucs = uniformCostSearch
+biastar = bidirectionalAStarSearch
+bibfs = bidirectionalBreadthFirstSearch
+biucs = bidirectionalUniformCostSearch
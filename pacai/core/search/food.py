@@ -1,14 +1,101 @@
 from pacai.core.actions import Actions
 from pacai.core.directions import Directions
+from pacai.core.grid import Grid
+from pacai.core.grid import countBits
+from pacai.core.grid import getBitIndexes
 from pacai.core.search.problem import SearchProblem
 
+class FoodSearchState(object):
+    """
+    A compact state for a `FoodSearchProblem`.
+
+    Pacman's position is stored as an index into the problem's open cells,
+    and the remaining food as a bitmask over the food that was on the board at the start
+    (bit i is set if `problem.foodPositions[i]` has not been eaten yet).
+    So hashing, comparing, and checking for goals do not depend on the size of the board.
+
+    For compatibility, a state can still be used like a tuple (pacmanPosition, foodGrid):
+    `position, foodGrid = state` works, but building the food grid costs more than
+    using FoodSearchState.getFoodPositions() or FoodSearchState.getNumFood().
+    """
+
+    __slots__ = ('_problem', 'positionIndex', 'foodMask')
+
+    def __init__(self, problem, positionIndex, foodMask):
+        self._problem = problem
+        self.positionIndex = positionIndex
+        self.foodMask = foodMask
+
+    def getFoodGrid(self):
+        """
+        Get the remaining food as a new `pacai.core.grid.Grid`.
+        """
+
+        walls = self._problem.walls
+        grid = Grid(walls.getWidth(), walls.getHeight())
+
+        bits = 0
+        for foodIndex in getBitIndexes(self.foodMask):
+            bits |= self._problem.foodGridBits[foodIndex]
+
+        grid.setBits(bits)
+        return grid
+
+    def getFoodPositions(self):
+        """
+        Get the positions of the remaining food (in the same order as `problem.foodPositions`).
+        """
+
+        foodPositions = self._problem.foodPositions
+        return [foodPositions[foodIndex] for foodIndex in getBitIndexes(self.foodMask)]
+
+    def getNumFood(self):
+        return countBits(self.foodMask)
+
+    def getPosition(self):
+        return self._problem.positions[self.positionIndex]
+
+    def __eq__(self, other):
+        if (not isinstance(other, FoodSearchState)):
+            return False
+
+        return self.positionIndex == other.positionIndex and self.foodMask == other.foodMask
+
+    def __getitem__(self, index):
+        # Only build the value that was asked for.
+        if (index in (0, -2)):
+            return self.getPosition()
+
+        if (index in (1, -1)):
+            return self.getFoodGrid()
+
+        # Slices (and bad indexes) behave the same as on a tuple.
+        return tuple(self)[index]
+
+    def __hash__(self):
+        return hash((self.positionIndex, self.foodMask))
+
+    def __iter__(self):
+        yield self.getPosition()
+        yield self.getFoodGrid()
+
+    def __len__(self):
+        return 2
+
+    def __lt__(self, other):
+        return (self.positionIndex, self.foodMask) < (other.positionIndex, other.foodMask)
+
+    def __str__(self):
+        return 'FoodSearchState(%s, %s)' % (str(self.getPosition()), str(self.getFoodPositions()))
+
 class FoodSearchProblem(SearchProblem):
     """
     A search problem associated with finding the a path that collects all of the
     food in a pacman game.
 
-    A search state in this problem is a tuple (pacmanPosition, foodGrid).
-    Wwhere pacmanPosition is a tuple (x, y) of integers specifying Pacman's position,
+    A search state in this problem is a `FoodSearchState`,
+    which can also be used like a tuple (pacmanPosition, foodGrid).
+    Where pacmanPosition is a tuple (x, y) of integers specifying Pacman's position,
     and foodGrid is a `pacai.core.grid.Grid` of either `True` or `False`,
     specifying remaining food.
     """
@@ -16,16 +103,35 @@ class FoodSearchProblem(SearchProblem):
     def __init__(self, startingGameState):
         super().__init__()
 
-        self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
         self.walls = startingGameState.getWalls()
         self.startingGameState = startingGameState
         self.heuristicInfo = {}  # A dictionary for the heuristic to store information
 
+        # All the open cells, a state's position index is an index into this list.
+        self.positions = self.walls.asList(False)
+        self.positionIndexes = {position: index for (index, position) in enumerate(self.positions)}
+
+        # All the food at the start, bit i of a state's food mask is for this list's food i.
+        self.foodPositions = startingGameState.getFood().asList()
+        self.foodIndexes = {food: index for (index, food) in enumerate(self.foodPositions)}
+
+        # The bit for each food in a food grid (see `pacai.core.grid.Grid.getBits`).
+        height = self.walls.getHeight()
+        self.foodGridBits = [1 << (x * height + y) for (x, y) in self.foodPositions]
+
+        # For each position index: ((next position index, direction, food bit), ...).
+        # The food bit is the bit (in the food mask) of any food in the next position (or 0).
+        self._moves = [self._findMoves(position) for position in self.positions]
+
+        self.start = FoodSearchState(self,
+                self.positionIndexes[startingGameState.getPacmanPosition()],
+                (1 << len(self.foodPositions)) - 1)
+
     def startingState(self):
         return self.start
 
     def isGoal(self, state):
-        return state[1].count() == 0
+        return state.foodMask == 0
 
     def successorStates(self, state):
         """
@@ -34,14 +140,11 @@ class FoodSearchProblem(SearchProblem):
 
         successors = []
         self._numExpanded += 1
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x, y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append((((nextx, nexty), nextFood), direction, 1))
+
+        foodMask = state.foodMask
+        for (nextIndex, direction, foodBit) in self._moves[state.positionIndex]:
+            nextState = FoodSearchState(self, nextIndex, foodMask & ~foodBit)
+            successors.append((nextState, direction, 1))
 
         return successors
 
@@ -51,7 +154,7 @@ class FoodSearchProblem(SearchProblem):
         If those actions include an illegal move, return 999999.
         """
 
-        x, y = self.startingState()[0]
+        x, y = self.startingState().getPosition()
         cost = 0
         for action in actions:
             # figure out the next state and see whether it's legal
@@ -62,3 +165,20 @@ class FoodSearchProblem(SearchProblem):
             cost += 1
 
         return cost
+
+    def _findMoves(self, position):
+        moves = []
+
+        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x, y = position
+            dx, dy = Actions.directionToVector(direction)
+            nextx, nexty = int(x + dx), int(y + dy)
+
+            if not self.walls.get(nextx, nexty):
+                foodBit = 0
+                if ((nextx, nexty) in self.foodIndexes):
+                    foodBit = 1 << self.foodIndexes[(nextx, nexty)]
+
+                moves.append((self.positionIndexes[(nextx, nexty)], direction, foodBit))
+
+        return tuple(moves)
@@ -35,6 +35,7 @@ def euclidean(position, problem):
 def numFood(state, problem):
     """
     This heuristic is the amount of food left to on the board.
+    The state must be a `pacai.core.search.food.FoodSearchState`.
     """
 
-    return state[1].count()
+    return state.getNumFood()
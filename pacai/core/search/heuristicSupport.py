@@ -0,0 +1,121 @@
+"""
+Precomputed tables for heuristics of problems where a set of targets (e.g. food or corners)
+all need to be visited.
+
+Heuristics are called for every node a search expands,
+so any maze distances they need should not be computed on every call.
+A `HeuristicSupport` computes all the cell-to-target and target-to-target distances once
+(with one breadth first search from each target, not all-pairs distances for the whole maze),
+and caches the values that only depend on which targets are left
+(keyed by a bitmask of the remaining targets).
+"""
+
+import sys
+
+from pacai.core.distanceCalculator import MazeIndex
+from pacai.core.grid import getBitIndexes
+
+# The key a problem's supports are stored under in `problem.heuristicInfo`
+# (along with the targets).
+HEURISTIC_INFO_KEY = 'heuristicSupport'
+
+class HeuristicSupport(object):
+    """
+    Maze distances between cells and targets.
+    Sets of remaining targets are given as bitmasks, where bit i is target i
+    (see HeuristicSupport.getMask()).
+    For a `pacai.core.search.food.FoodSearchProblem` with problem.foodPositions as the targets,
+    these are the same as a state's foodMask.
+    Unreachable targets are sys.maxsize away.
+    """
+
+    def __init__(self, walls, targets):
+        self.targets = list(targets)
+        self.targetIndexes = {target: index for (index, target) in enumerate(self.targets)}
+
+        index = MazeIndex(walls)
+        unreachable = index.unreachable
+
+        # {(x, y): (distance to target 0, distance to target 1, ...), ...}
+        self._cellDistances = {}
+
+        # [[distance from target i to target j, ...], ...]
+        self._targetDistances = []
+
+        targetRows = []
+        for target in self.targets:
+            row = index.bfs(index.indexes[target])
+            targetRows.append([sys.maxsize if (distance == unreachable) else distance
+                    for distance in row])
+
+        for (cellIndex, cell) in enumerate(index.positions):
+            self._cellDistances[cell] = tuple(row[cellIndex] for row in targetRows)
+
+        for target in self.targets:
+            self._targetDistances.append(list(self._cellDistances[target]))
+
+        # {mask: (distance, target index, target index), ...}
+        self._farthestPairs = {}
+
+    def getDistance(self, position, targetIndex):
+        return self._cellDistances[position][targetIndex]
+
+    def getFarthestPair(self, mask):
+        """
+        Get the two remaining targets that are the farthest apart: (distance, index, index).
+        The indexes are None if there are fewer than two targets left.
+        """
+
+        if (mask not in self._farthestPairs):
+            best = (0, None, None)
+
+            indexes = getBitIndexes(mask)
+            for (i, first) in enumerate(indexes):
+                row = self._targetDistances[first]
+                for second in indexes[(i + 1):]:
+                    if (row[second] > best[0]):
+                        best = (row[second], first, second)
+
+            self._farthestPairs[mask] = best
+
+        return self._farthestPairs[mask]
+
+    def getMask(self, targets):
+        """
+        Get the bitmask for a collection of targets.
+        """
+
+        mask = 0
+        for target in targets:
+            mask |= 1 << self.targetIndexes[target]
+
+        return mask
+
+    def getNearest(self, position, mask):
+        """
+        Get the remaining target closest to a position: (distance, target index).
+        Ties go to the target with the lower index.
+        Returns (0, None) if there are no targets left.
+        """
+
+        if (mask == 0):
+            return (0, None)
+
+        distances = self._cellDistances[position]
+        return min((distances[index], index) for index in getBitIndexes(mask))
+
+    def getTargetDistance(self, first, second):
+        return self._targetDistances[first][second]
+
+def getHeuristicSupport(problem, targets):
+    """
+    Get the `HeuristicSupport` for a problem and targets, building it the first time it is needed.
+    It is kept in `problem.heuristicInfo`, so every call to a heuristic on the same problem
+    (with the same targets) shares the same tables.
+    """
+
+    key = (HEURISTIC_INFO_KEY, tuple(targets))
+    if (key not in problem.heuristicInfo):
+        problem.heuristicInfo[key] = HeuristicSupport(problem.walls, targets)
+
+    return problem.heuristicInfo[key]
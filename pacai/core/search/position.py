@@ -37,6 +37,18 @@ class PositionSearchProblem(SearchProblem):
     def startingState(self):
         return self.startState
 
+    def goalState(self):
+        """
+        Returns the goal position, or None if there is no single goal position.
+        Subclasses that have their own goal test (like `AnyFoodSearchProblem`)
+        may have any number of goals, so they have no goal state unless they override this.
+        """
+
+        if (self.goal is None or type(self).isGoal is not PositionSearchProblem.isGoal):
+            return None
+
+        return self.goal
+
     def isGoal(self, state):
         if (state != self.goal):
             return False
@@ -63,7 +75,7 @@ class PositionSearchProblem(SearchProblem):
             dx, dy = Actions.directionToVector(action)
             nextx, nexty = int(x + dx), int(y + dy)
 
-            if (not self.walls[nextx][nexty]):
+            if (not self.walls.get(nextx, nexty)):
                 nextState = (nextx, nexty)
                 cost = self.costFn(nextState)
 
@@ -80,6 +92,41 @@ class PositionSearchProblem(SearchProblem):
 
         return successors
 
+    def predecessorStates(self, state):
+        """
+        Returns the states that can move into this state, the actions they require,
+        and the cost of moving into this state.
+        Used to search backwards from the goal (see `pacai.core.search.engine`).
+
+        This counts as expanding the state (see getExpandedCount()),
+        so the count for a bidirectional search includes both directions.
+        """
+
+        predecessors = []
+
+        # Bookkeeping for display purposes (the highlight in the GUI).
+        self._numExpanded += 1
+        if (state not in self._visitedLocations):
+            self._visitedLocations.add(state)
+            # Note: visit history requires coordinates not states. In this situation
+            # they are equivalent.
+            coordinates = state
+            self._visitHistory.append(coordinates)
+
+        # Nothing can move into a wall.
+        if (self.walls.get(*state)):
+            return predecessors
+
+        for action in Directions.CARDINAL:
+            x, y = state
+            dx, dy = Actions.directionToVector(action)
+            previousX, previousY = int(x - dx), int(y - dy)
+
+            if (not self.walls.get(previousX, previousY)):
+                predecessors.append(((previousX, previousY), action, self.costFn(state)))
+
+        return predecessors
+
     def actionsCost(self, actions):
         """
         Returns the cost of a particular sequence of actions.
@@ -20,6 +20,12 @@ class SearchProblem(abc.ABC):
     states,
     while `SearchProblem.isGoal` and `SearchProblem.actionsCost` evaluate
     those same states and actions.
+
+    Problems with exactly one goal state can also be searched backwards from the goal
+    (see the bidirectional searches in `pacai.core.search.engine`) by implementing two more methods:
+    `goalState()`, which returns the goal state (or None if there is no single goal state),
+    and `predecessorStates(state)`, which answers the question "What moves lead to this state?"
+    in the same format as `SearchProblem.successorStates`.
     """
 
     def __init__(self):
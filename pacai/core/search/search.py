@@ -1,4 +1,7 @@
+from pacai.core import jumpPoint
 from pacai.core.directions import Directions
+from pacai.core.mazeGraph import getMazeGraph
+from pacai.core.search.position import DEFAULT_COST_FUNCTION
 from pacai.student import search
 
 def tinyMazeSearch(problem):
@@ -13,6 +16,31 @@ def tinyMazeSearch(problem):
 
     return [s, s, w, s, w, w, s, w]
 
+def jumpPointSearch(problem):
+    """
+    Solves a `pacai.core.search.position.PositionSearchProblem` (with the default, constant cost)
+    using Jump Point Search (see `pacai.core.jumpPoint`),
+    which skips over the many equivalent paths through open areas.
+    """
+
+    if (problem.costFn is not DEFAULT_COST_FUNCTION):
+        raise ValueError('Jump point search only supports the default (constant) cost function.')
+
+    return jumpPoint.getActions(problem.walls, problem.startingState(), problem.goal)
+
+def mazeGraphSearch(problem):
+    """
+    Solves a `pacai.core.search.position.PositionSearchProblem` (with the default, constant cost)
+    using the maze's junction graph (see `pacai.core.mazeGraph`)
+    instead of expanding the maze one cell at a time.
+    """
+
+    if (problem.costFn is not DEFAULT_COST_FUNCTION):
+        raise ValueError('Maze graph search only supports the default (constant) cost function.')
+
+    graph = getMazeGraph(problem.walls)
+    return graph.getActions(problem.startingState(), problem.goal)
+
 # Abbreviations
 
 breadthFirstSearch = search.breadthFirstSearch
@@ -0,0 +1,94 @@
+"""
+Random keys for Zobrist hashing game states.
+
+A Zobrist hash is the XOR of a random key for each component of a state
+(each remaining food, each remaining capsule, each agent's position, etc).
+Since XOR is its own inverse, a state's hash can be updated in O(1) when a single
+component changes (just XOR out the old key and XOR in the new one),
+instead of being rebuilt from the entire board.
+"""
+
+import random
+
+# Keys come from their own seeded generator so hashes are reproducible
+# and building keys does not disturb the global random state (that seeded games rely on).
+DEFAULT_SEED = 140
+KEY_BITS = 64
+
+class ZobristKeys(object):
+    """
+    The Zobrist keys for a single layout.
+    Board keys (food and capsules) are precomputed for every cell,
+    agent keys are generated the first time they are needed.
+    """
+
+    def __init__(self, width, height, seed = DEFAULT_SEED):
+        self._height = height
+        self._rng = random.Random(seed)
+
+        self._foodKeys = [self._rng.getrandbits(KEY_BITS) for i in range(width * height)]
+        self._capsuleKeys = [self._rng.getrandbits(KEY_BITS) for i in range(width * height)]
+
+        self._agentKeys = []
+
+    def capsule(self, x, y):
+        return self._capsuleKeys[x * self._height + y]
+
+    def capsulesHash(self, capsules):
+        """
+        Get the combined key for all the given capsule positions.
+        """
+
+        value = 0
+        for (x, y) in capsules:
+            value ^= self.capsule(x, y)
+
+        return value
+
+    def food(self, x, y):
+        return self._foodKeys[x * self._height + y]
+
+    def foodHash(self, food):
+        """
+        Get the combined key for all the food in a `pacai.core.grid.Grid`.
+        """
+
+        value = 0
+        for (x, y) in food.asList():
+            value ^= self.food(x, y)
+
+        return value
+
+    def getAgentKeys(self, agentIndex):
+        """
+        Get the keys for a specific agent.
+        Each agent gets its own keys, so two agents swapping places changes the hash.
+        """
+
+        while (len(self._agentKeys) <= agentIndex):
+            self._agentKeys.append(AgentKeys(self._rng))
+
+        return self._agentKeys[agentIndex]
+
+class AgentKeys(object):
+    """
+    The Zobrist keys for a single agent.
+    Agent positions can be fractional (e.g. slowed scared ghosts) and scared timers depend on
+    the game's rules, so these keys are generated on demand.
+    """
+
+    def __init__(self, rng):
+        self._rng = rng
+        self._keys = {}
+
+    def get(self, field, value):
+        """
+        Get the key for an agent field (e.g. 'position') having a specific value.
+        """
+
+        key = (field, value)
+
+        if (key not in self._keys):
+            self._keys[key] = self._rng.getrandbits(KEY_BITS)
+
+        return self._keys[key]
@@ -53,8 +53,7 @@ class ReflexAgent(BaseAgent):
 
         # Useful information you can extract.
         newPosition = successorGameState.getPacmanPosition()
-        oldFood = currentGameState.getFood()
-        foodCoordinates = oldFood.asList()
+        foodCoordinates = currentGameState.getFoodPositions()
         newGhostStates = successorGameState.getGhostStates()
         newCapsuleStates = successorGameState.getCapsules()
         newScaredTimes = [ghostState.getScaredTimer() for ghostState in newGhostStates]
@@ -148,12 +147,12 @@ class MinimaxAgent(MultiAgentSearchAgent):
         super().__init__(index, **kwargs)
 
     def getAction(self, gameState):
-        # Collect legal moves.
-        legalMoves = gameState.getLegalActions()
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
+        # Collect legal moves and their successors.
+        successors = [(action, state) for (action, state) in gameState.generateSuccessors(0)
+                if action != 'Stop']
+        legalMoves = [action for (action, state) in successors]
         # Choose one of the best actions.
-        states = [gameState.generateSuccessor(0, action) for action in legalMoves]
+        states = [state for (action, state) in successors]
         scores = [self.minmax(state, 0, 0) for state in states] #
         bestScore = max(scores)
         bestIndices = [index for index in range(len(scores)) if scores[index] == bestScore] # gives you indices of best score
@@ -171,11 +170,9 @@ class MinimaxAgent(MultiAgentSearchAgent):
         
     def maxAgent(self, gameState, agent, eval_depth):
         max_eval = (math.inf)*-1
-        legalMoves = gameState.getLegalActions(agent)
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
-        for action in legalMoves:
-            successorState = gameState.generateSuccessor(agent,action)
+        successors = [state for (action, state) in gameState.generateSuccessors(agent)
+                if action != 'Stop']
+        for successorState in successors:
             score = self.minmax( successorState, agent+1, eval_depth)
             if (score > max_eval):
                 max_eval = score
@@ -183,14 +180,12 @@ class MinimaxAgent(MultiAgentSearchAgent):
 
     def minAgent(self, gameState, agent, eval_depth):
         min_eval = math.inf
-        legalMoves = gameState.getLegalActions(agent)
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
+        successors = [state for (action, state) in gameState.generateSuccessors(agent)
+                if action != 'Stop']
         lastGhost = (agent+1)% gameState.getNumAgents() == 0
         if (lastGhost):
             eval_depth+=1
-        for action in legalMoves:
-            successorState = gameState.generateSuccessor(agent,action)
+        for successorState in successors:
             if (lastGhost):
                 score = self.minmax(successorState, 0, eval_depth)
             else:
@@ -215,14 +210,14 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         super().__init__(index, **kwargs)
 
     def getAction(self, gameState):
-        # Collect legal moves.
-        legalMoves = gameState.getLegalActions()
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
+        # Collect legal moves and their successors.
+        successors = [(action, state) for (action, state) in gameState.generateSuccessors(0)
+                if action != 'Stop']
+        legalMoves = [action for (action, state) in successors]
         # Choose one of the best actions.
         a = (math.inf)*-1
         b = math.inf
-        states = [gameState.generateSuccessor(0, action) for action in legalMoves]
+        states = [state for (action, state) in successors]
         scores = [self.ABminmax(state, 0, 0, a, b) for state in states] #
         bestScore = max(scores)
         bestIndices = [index for index in range(len(scores)) if scores[index] == bestScore] # gives you indices of best score
@@ -241,11 +236,9 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         
     def maxAgent(self, gameState,  agent, eval_depth, Alpha, Beta):
         max_eval = (math.inf)*-1
-        legalMoves = gameState.getLegalActions(agent)
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
-        for action in legalMoves:
-            successorState = gameState.generateSuccessor(agent,action)
+        for (action, successorState) in gameState.generateSuccessors(agent):
+            if (action == 'Stop'):
+                continue
             score = self.ABminmax( successorState, agent+1, eval_depth, Alpha, Beta)
             if (score > max_eval):
                 max_eval = score
@@ -257,14 +250,12 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
 
     def minAgent(self, gameState, agent, eval_depth, Alpha, Beta):
         min_eval = math.inf
-        legalMoves = gameState.getLegalActions(agent)
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
         lastGhost = (agent+1)% gameState.getNumAgents() == 0
         if (lastGhost):
             eval_depth+=1
-        for action in legalMoves:
-            successorState = gameState.generateSuccessor(agent,action)
+        for (action, successorState) in gameState.generateSuccessors(agent):
+            if (action == 'Stop'):
+                continue
             if (lastGhost):
                 score = self.ABminmax(successorState, 0, eval_depth, Alpha, Beta)
             else:
@@ -295,12 +286,12 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         super().__init__(index, **kwargs)
 
     def getAction(self, gameState):
-        # Collect legal moves.
-        legalMoves = gameState.getLegalActions()
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
+        # Collect legal moves and their successors.
+        successors = [(action, state) for (action, state) in gameState.generateSuccessors(0)
+                if action != 'Stop']
+        legalMoves = [action for (action, state) in successors]
         # Choose one of the best actions.
-        states = [gameState.generateSuccessor(0, action) for action in legalMoves]
+        states = [state for (action, state) in successors]
         scores = [self.expectimax(state, 0, 0) for state in states] #
         bestScore = max(scores)
         bestIndices = [index for index in range(len(scores)) if scores[index] == bestScore] # gives you indices of best score
@@ -318,11 +309,9 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
 
     def maxAgent(self, gameState, agent, eval_depth):
         max_eval = (math.inf)*-1
-        legalMoves = gameState.getLegalActions(agent)
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
-        for action in legalMoves:
-            successorState = gameState.generateSuccessor(agent,action)
+        successors = [state for (action, state) in gameState.generateSuccessors(agent)
+                if action != 'Stop']
+        for successorState in successors:
             score = self.expectimax( successorState, agent+1, eval_depth)
             if (score > max_eval):
                 max_eval = score
@@ -330,15 +319,13 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         
     def expectiAgent(self, gameState, agent, eval_depth):
         expecti_eval = 0
-        legalMoves = gameState.getLegalActions(agent)
-        if ('Stop' in legalMoves):
-            legalMoves.remove('Stop')
-        distrution = 1.0/len(legalMoves)
+        successors = [state for (action, state) in gameState.generateSuccessors(agent)
+                if action != 'Stop']
+        distrution = 1.0/len(successors)
         lastGhost = (agent+1)% gameState.getNumAgents() == 0
         if (lastGhost):
             eval_depth+=1
-        for action in legalMoves:
-            successorState = gameState.generateSuccessor(agent, action)
+        for successorState in successors:
             if (lastGhost):
                 expecti_eval += self.expectimax(successorState, 0, eval_depth) * distrution
             else:
@@ -353,8 +340,7 @@ def betterEvaluationFunction(currentGameState):
     """
         # Useful information extracted.
     Position = currentGameState.getPacmanPosition()
-    Food = currentGameState.getFood()
-    foodCoordinates = Food.asList()
+    foodCoordinates = currentGameState.getFoodPositions()
     GhostStates = currentGameState.getGhostStates()
     CapsuleStates = currentGameState.getCapsules()
     ScaredTimes = [ghostState.getScaredTimer() for ghostState in GhostStates]
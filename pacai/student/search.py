@@ -43,7 +43,7 @@ def depthFirstSearch(problem):
         for child in problem.successorStates(current_state):
             childstate = child[0]
             action = child[1]
-            if childstate not in reached and childstate not in fringe.list:
+            if childstate not in reached:
                 fringe.push((childstate, current_path + [action]))
     return None
 
@@ -58,7 +58,7 @@ def breadthFirstSearch(problem):
     current_path = []
     if (problem.isGoal(node)):
         return actions
-    fringe = Queue()
+    fringe = Queue(key = lambda item: item[0])
     fringe.push((node, actions))
 
     while (not fringe.isEmpty()):
@@ -75,7 +75,7 @@ def breadthFirstSearch(problem):
         for child in problem.successorStates(current_state):
             childstate = child[0]
             action = child[1]
-            if childstate not in reached and childstate not in fringe.list:
+            if childstate not in reached and childstate not in fringe:
                 if isinstance(action, list):
                     fringe.push((childstate, current_path + action))
                 else:
@@ -15,6 +15,7 @@ from pacai.agents.base import BaseAgent
 from pacai.agents.search.base import SearchAgent
 from pacai.core.directions import Directions
 from pacai.core.distance import manhattan
+from pacai.core.search.heuristicSupport import getHeuristicSupport
 
 class CornersProblem(SearchProblem):
     """
@@ -62,6 +63,7 @@ class CornersProblem(SearchProblem):
 
         self.corners = ((1, 1), (1, top), (right, 1), (right, top))
         self.neededcorners = self.corners
+        self.heuristicInfo = {}  # A dictionary for the heuristic to store information
         for corner in self.corners:
             if not startingGameState.hasFood(*corner):
                 logging.warning('Warning: no food in corner ' + str(corner))
@@ -143,21 +145,19 @@ def cornersHeuristic(state, problem):
     # walls = problem.walls  # These are the walls of the maze, as a Grid.
 
     # *** Your Code Here ***
+    # Maze distances come from tables built once per problem.
+    support = getHeuristicSupport(problem, problem.corners)
+
     ret = 0
-    wallmaze = problem.walls
-    corners = list(problem.corners)
     current_pos = state[0]
-    distances = []
-    while (len(corners) > 0):
-        distances = []
-        for corner in corners:
-            distance = trueDist(wallmaze, current_pos, corner)
-            distances.append((distance, corner))
-        distances.sort(key = lambda x: x[0])
-        mindist, mincorner = distances[0]
+    remaining = support.getMask(problem.corners)
+
+    # Greedily walk to the closest corner.
+    while (remaining != 0):
+        mindist, cornerIndex = support.getNearest(current_pos, remaining)
         ret += mindist
-        current_pos = mincorner
-        corners.remove(mincorner)
+        current_pos = problem.corners[cornerIndex]
+        remaining &= ~(1 << cornerIndex)
     return ret
 
 def trueDist(maze, start, end):
@@ -190,9 +190,10 @@ def foodHeuristic(state, problem):
     On the other hand, inadmissible or inconsistent heuristics may find optimal solutions,
     so be careful.
 
-    The state is a tuple (pacmanPosition, foodGrid) where foodGrid is a
+    The state is a `pacai.core.search.food.FoodSearchState`,
+    which can be unpacked into a tuple (pacmanPosition, foodGrid) where foodGrid is a
     `pacai.core.grid.Grid` of either True or False.
-    You can call `foodGrid.asList()` to get a list of food coordinates instead.
+    You can call `state.getFoodPositions()` to get a list of food coordinates instead.
 
     If you want access to info like walls, capsules, etc., you can query the problem.
     For example, `problem.walls` gives you a Grid of where the walls are.
@@ -206,24 +207,16 @@ def foodHeuristic(state, problem):
     Subsequent calls to this heuristic can access problem.heuristicInfo['wallCount'].
     """
 
-    current_pos, foodGrid = state
-
-    food_coord = foodGrid.asList()
-    distances = []
-    distances_food = [0]
-    wallmaze = problem.walls
+    # Maze distances come from tables built once per problem,
+    # and the farthest pair of food is cached for each set of remaining food.
+    support = getHeuristicSupport(problem, problem.foodPositions)
 
-    for food in food_coord:
-        distances.append(trueDist(wallmaze, current_pos, food))
-        for fooddist in food_coord:
-            distances_food.append(trueDist(wallmaze, food, fooddist))
+    if (state.foodMask == 0):
+        return 0
 
-    if len(distances):
-        mindist = min(distances)
-        farthest_food = max(distances_food)
-        return mindist + farthest_food
-    else:
-        return max(distances_food)
+    mindist = support.getNearest(state.getPosition(), state.foodMask)[0]
+    farthest_food = support.getFarthestPair(state.foodMask)[0]
+    return mindist + farthest_food
 
 class ClosestDotSearchAgent(SearchAgent):
     """
@@ -239,7 +232,7 @@ class ClosestDotSearchAgent(SearchAgent):
 
         currentState = state
 
-        while (currentState.getFood().count() > 0):
+        while (currentState.getNumFood() > 0):
             nextPathSegment = self.findPathToClosestDot(currentState)  # The missing piece
             self._actions += nextPathSegment
 
@@ -265,10 +258,9 @@ class ClosestDotSearchAgent(SearchAgent):
         # problem = AnyFoodSearchProblem(gameState)
 
         startPosition = gameState.getPacmanPosition()
-        foodGrid = gameState.getFood()
         wallmaze = gameState.getWalls()
         problem = AnyFoodSearchProblem(gameState)
-        food_coord = foodGrid.asList()
+        food_coord = gameState.getFoodPositions()
 
         distances = []
         for food in food_coord:
@@ -281,7 +273,7 @@ class ClosestDotSearchAgent(SearchAgent):
         if (problem.isGoal(startPosition, closestfood)):
             return actions
         
-        fringe = Queue()
+        fringe = Queue(key = lambda item: item[0])
         fringe.push((startPosition, actions))
         while (not fringe.isEmpty()):
             current_state, current_path = fringe.pop()
@@ -297,7 +289,7 @@ class ClosestDotSearchAgent(SearchAgent):
             for child in problem.successorStates(current_state):
                 childstate = child[0]
                 action = child[1]
-                if childstate not in reached and childstate not in fringe.list:
+                if childstate not in reached and childstate not in fringe:
                     fringe.push((childstate, current_path + [action]))
         return None
 
@@ -4,6 +4,9 @@ Priority queue containers.
 
 import heapq
 
+# Marks entries in an `IndexedPriorityQueue` heap whose item was removed (or updated).
+_REMOVED = object()
+
 class PriorityQueue(object):
     """
     Implements a priority queue data structure.
@@ -56,3 +59,158 @@ class PriorityQueueWithFunction(PriorityQueue):
 
     def __len__(self):
         return len(self.heap)
+
+class IndexedPriorityQueue(object):
+    """
+    A priority queue that knows where each of its items is,
+    so items can be looked up and have their priority changed
+    (instead of being pushed again with a different priority).
+    Items must be hashable and each item can only be in the queue once.
+
+    Changing or removing an item just marks its old heap entry as removed
+    (the entry is skipped when it reaches the top of the heap).
+    Once removed entries make up most of the heap, the heap is compacted.
+
+    Items with the same priority are popped in the order they were pushed (or last updated),
+    so items themselves are never compared.
+    """
+
+    # Removed entries are only cleaned out once the heap is at least this big.
+    MIN_COMPACT_SIZE = 64
+
+    def __init__(self):
+        # [[priority, order, item], ...]
+        self.heap = []
+
+        # {item: heap entry, ...}
+        self._entries = {}
+
+        self._order = 0
+        self._numRemoved = 0
+
+    def contains(self, item):
+        return item in self._entries
+
+    def decreaseKey(self, item, priority):
+        """
+        Lower the priority of an item that is already in the queue.
+        Raises a KeyError if the item is not in the queue,
+        and a ValueError if the new priority is higher than the current one.
+        """
+
+        if (priority > self._entries[item][0]):
+            raise ValueError("New priority (%s) is higher than the current priority (%s)." %
+                    (priority, self._entries[item][0]))
+
+        self.push(item, priority)
+
+    def isEmpty(self):
+        return len(self._entries) == 0
+
+    def peek(self):
+        """
+        Get the item with the lowest priority along with its priority (without removing it):
+        (item, priority).
+        """
+
+        while (self.heap[0][2] is _REMOVED):
+            heapq.heappop(self.heap)
+            self._numRemoved -= 1
+
+        return (self.heap[0][2], self.heap[0][0])
+
+    def pop(self):
+        """
+        Remove and return the item with the lowest priority.
+        """
+
+        return self.popWithPriority()[0]
+
+    def popWithPriority(self):
+        """
+        Remove and return the item with the lowest priority along with its priority:
+        (item, priority).
+        """
+
+        while (True):
+            (priority, order, item) = heapq.heappop(self.heap)
+            if (item is _REMOVED):
+                self._numRemoved -= 1
+                continue
+
+            del self._entries[item]
+            return (item, priority)
+
+    def priorityOf(self, item):
+        """
+        Get the current priority of an item.
+        Raises a KeyError if the item is not in the queue.
+        """
+
+        return self._entries[item][0]
+
+    def push(self, item, priority):
+        """
+        Add an item to the queue.
+        If the item is already in the queue, then its priority is replaced.
+        """
+
+        if (item in self._entries):
+            self._markRemoved(item)
+
+        entry = [priority, self._order, item]
+        self._order += 1
+
+        self._entries[item] = entry
+        heapq.heappush(self.heap, entry)
+
+        self._compact()
+
+    def remove(self, item):
+        """
+        Remove an item from the queue.
+        Raises a KeyError if the item is not in the queue.
+        """
+
+        self._markRemoved(item)
+        self._compact()
+
+    def update(self, item, priority):
+        """
+        Add an item to the queue, or lower its priority if it is already in the queue.
+        Nothing happens if the item is already in the queue with the same or a lower priority.
+        Returns True if the queue changed.
+        """
+
+        if (item in self._entries and self._entries[item][0] <= priority):
+            return False
+
+        self.push(item, priority)
+        return True
+
+    def _compact(self):
+        """
+        Rebuild the heap without any removed entries once they make up over half of the heap.
+        """
+
+        if (len(self.heap) < IndexedPriorityQueue.MIN_COMPACT_SIZE
+                or self._numRemoved * 2 <= len(self.heap)):
+            return
+
+        self.heap = [entry for entry in self.heap if (entry[2] is not _REMOVED)]
+        heapq.heapify(self.heap)
+        self._numRemoved = 0
+
+    def _markRemoved(self, item):
+        entry = self._entries.pop(item)
+
+        # The priority and order stay in place (so the heap stays valid),
+        # only the item is replaced.
+        entry[2] = _REMOVED
+        self._numRemoved += 1
+
+    def __contains__(self, item):
+        return item in self._entries
+
+    def __len__(self):
+        return len(self._entries)
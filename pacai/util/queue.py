@@ -2,20 +2,37 @@
 A queue container data structure.
 """
 
+import collections
+
 class Queue(object):
     """
     A container with a first-in-first-out (FIFO) queuing policy.
+
+    If a key function is given, then the queue also keeps a count of the keys of its items,
+    so checking if a key is in the queue (`key in queue`) does not need to look at every item.
+    Otherwise, `item in queue` compares against every item.
     """
 
-    def __init__(self):
-        self.list = []
+    def __init__(self, key = None):
+        # Oldest first, so items are pushed on the right and popped from the left.
+        self._items = collections.deque()
+
+        self._key = key
+        self._counts = None
+
+        if (key is not None):
+            self._counts = {}
 
     def push(self, item):
         """
         Enqueue the item into the queue.
         """
 
-        self.list.insert(0, item)
+        self._items.append(item)
+
+        if (self._counts is not None):
+            key = self._key(item)
+            self._counts[key] = self._counts.get(key, 0) + 1
 
     def pop(self):
         """
@@ -23,14 +40,38 @@ class Queue(object):
         This operation removes the item from the queue.
         """
 
-        return self.list.pop()
+        item = self._items.popleft()
+
+        if (self._counts is not None):
+            key = self._key(item)
+            if (self._counts[key] == 1):
+                del self._counts[key]
+            else:
+                self._counts[key] -= 1
+
+        return item
+
+    @property
+    def list(self):
+        """
+        A copy of the items as a list, with the most recently enqueued item first
+        (the same order that queues have always used for this attribute).
+        """
+
+        return list(reversed(self._items))
 
     def isEmpty(self):
         """
         Returns True if the queue is empty.
         """
 
-        return len(self.list) == 0
+        return len(self._items) == 0
+
+    def __contains__(self, value):
+        if (self._counts is None):
+            return value in self._items
+
+        return value in self._counts
 
     def __len__(self):
-        return len(self.list)
+        return len(self._items)
@@ -5,11 +5,21 @@ A stack data structure.
 class Stack(object):
     """
     A container with a last-in-first-out (LIFO) queuing policy.
+
+    If a key function is given, then the stack also keeps a count of the keys of its items,
+    so checking if a key is in the stack (`key in stack`) does not need to look at every item.
+    Otherwise, `item in stack` compares against every item.
     """
 
-    def __init__(self):
+    def __init__(self, key = None):
         self.list = []
 
+        self._key = key
+        self._counts = None
+
+        if (key is not None):
+            self._counts = {}
+
     def push(self, item):
         """
         Push an item onto the stack.
@@ -17,12 +27,25 @@ class Stack(object):
 
         self.list.append(item)
 
+        if (self._counts is not None):
+            key = self._key(item)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
     def pop(self):
         """
         Pop the most recently pushed item from the stack.
         """
 
-        return self.list.pop()
+        item = self.list.pop()
+
+        if (self._counts is not None):
+            key = self._key(item)
+            if (self._counts[key] == 1):
+                del self._counts[key]
+            else:
+                self._counts[key] -= 1
+
+        return item
 
     def isEmpty(self):
         """
@@ -31,5 +54,11 @@ class Stack(object):
 
         return len(self.list) == 0
 
+    def __contains__(self, value):
+        if (self._counts is None):
+            return value in self.list
+
+        return value in self._counts
+
     def __len__(self):
         return len(self.list)
@@ -0,0 +1,51 @@
+import unittest
+
+from pacai.core.actions import Actions
+from pacai.core.directions import Directions
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+"""
+Test the precomputed move tables against computing moves directly.
+"""
+class MoveTableTest(unittest.TestCase):
+    def test_matches_actions(self):
+        for name in ['mediumClassic', 'tinyCapture']:
+            layout = getLayout(name)
+            walls = layout.walls
+            moveTable = layout.getMoveTable()
+
+            for position in walls.asList(False):
+                for direction in Actions._directions:
+                    self.assertEqual(Actions.getPossibleActions(position, direction, walls),
+                            list(moveTable.getPossibleActions(position, direction)))
+
+                self.assertEqual(Actions.getLegalNeighbors(position, walls),
+                        list(moveTable.getLegalNeighbors(position)))
+
+    def test_fractional_positions(self):
+        layout = getLayout('mediumClassic')
+        moveTable = layout.getMoveTable()
+
+        self.assertEqual((Directions.EAST, ),
+                moveTable.getPossibleActions((1.5, 1), Directions.EAST))
+        self.assertEqual((Directions.EAST, ),
+                moveTable.getNonReversingActions((1.5, 1), Directions.EAST))
+        self.assertEqual(tuple(Actions.getLegalNeighbors((1.5, 1), layout.walls)),
+                moveTable.getLegalNeighbors((1.5, 1)))
+
+    def test_non_reversing(self):
+        moveTable = Layout(['%%%%%', '%   %', '%%%%%']).getMoveTable()
+
+        # A corridor (open to the east and west).
+        self.assertEqual((Directions.EAST, ),
+                moveTable.getNonReversingActions((2, 1), Directions.EAST))
+        self.assertEqual((Directions.EAST, Directions.WEST),
+                moveTable.getNonReversingActions((2, 1), Directions.STOP))
+
+        # A dead end (only open to the east), reversing is allowed.
+        self.assertEqual((Directions.EAST, ),
+                moveTable.getNonReversingActions((1, 1), Directions.WEST))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,14 @@
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
 
 from pacai.bin import capture
 from pacai.bin import gridworld
 from pacai.bin import pacman
+from pacai.core import distanceCalculator
+from pacai.core.layout import getLayout
 
 """
 This is a test class to assess the executables of this project.
@@ -33,6 +39,40 @@ class BinTest(unittest.TestCase):
         # Run game of capture with default agents.
         capture.main(['--null-graphics'])
 
+    def test_distance_cache(self):
+        oldCacheDir = distanceCalculator.diskCacheDir
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            try:
+                # Start like a new process, with nothing cached.
+                distanceCalculator.distanceMap.clear()
+                distanceCalculator.partialMap.clear()
+
+                capture.main(['--null-graphics', '--distance-cache', tempDir])
+                self.assertEqual(tempDir, distanceCalculator.diskCacheDir)
+
+                walls = getLayout('defaultCapture').walls
+                path = os.path.join(tempDir, distanceCalculator.wallsKey(walls)
+                        + distanceCalculator.CACHE_FILE_EXTENSION)
+                self.assertTrue(os.path.isfile(path))
+
+                # The next run maps the saved distances.
+                distanceCalculator.distanceMap.clear()
+                matrix = distanceCalculator.getCachedDistanceMatrix(walls)
+                self.assertIsInstance(matrix.getRawDistances(), memoryview)
+
+                # Other runs can turn the cache on with an environment variable.
+                env = dict(os.environ)
+                env[distanceCalculator.CACHE_DIR_ENV] = tempDir
+                output = subprocess.run([sys.executable, '-c',
+                        'from pacai.core import distanceCalculator; '
+                        + 'print(distanceCalculator.diskCacheDir)'],
+                        env = env, stdout = subprocess.PIPE, check = True).stdout
+                self.assertEqual(tempDir, output.decode().strip())
+            finally:
+                distanceCalculator.diskCacheDir = oldCacheDir
+                distanceCalculator.distanceMap.clear()
+
     def test_capture_help(self):
         # Show all capture arguments.
         try:
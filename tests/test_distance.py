@@ -0,0 +1,296 @@
+import os
+import tempfile
+import time
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core import distanceCalculator
+from pacai.core.distance import maze
+from pacai.core.distanceCalculator import Distancer
+from pacai.core.distanceCalculator import computeDistances
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+TEST_LAYOUT = [
+    '%%%%%%%',
+    '%     %',
+    '% %%% %',
+    '%   %.%',
+    '%%%%%%%',
+]
+
+"""
+Test maze distances.
+"""
+class DistanceTest(unittest.TestCase):
+    def setUp(self):
+        self.layout = Layout(TEST_LAYOUT)
+
+    def test_compute_distances(self):
+        distances = computeDistances(self.layout)
+
+        self.assertEqual(0, distances.getDistance((1, 1), (1, 1)))
+        self.assertEqual(2, distances.getDistance((1, 1), (3, 1)))
+        self.assertEqual(6, distances.getDistance((1, 1), (5, 3)))
+        self.assertEqual(10, distances.getDistance((3, 1), (5, 1)))
+        self.assertEqual(10, distances.getDistance((5, 1), (3, 1)))
+
+        with self.assertRaises(KeyError):
+            distances.getDistance((0, 0), (1, 1))
+
+    def test_cache(self):
+        oldCacheDir = distanceCalculator.diskCacheDir
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            distanceCalculator.diskCacheDir = tempDir
+            distanceCalculator.distanceMap.clear()
+
+            try:
+                walls = self.layout.walls
+                matrix = distanceCalculator.getDistanceMatrix(walls)
+                self.assertIs(matrix, distanceCalculator.getDistanceMatrix(walls.copy()))
+
+                path = os.path.join(tempDir, distanceCalculator.wallsKey(walls)
+                        + distanceCalculator.CACHE_FILE_EXTENSION)
+                self.assertTrue(os.path.isfile(path))
+
+                # A new process would map the file instead of computing the distances.
+                distanceCalculator.distanceMap.clear()
+                mapped = distanceCalculator.getDistanceMatrix(walls)
+
+                self.assertIsNot(matrix, mapped)
+                self.assertIsInstance(mapped.getRawDistances(), memoryview)
+                self.assertEqual(list(matrix.getRawDistances()), list(mapped.getRawDistances()))
+                self.assertEqual(10, mapped.getDistance((3, 1), (5, 1)))
+
+                # Changed distances are caught by the checksum.
+                with open(path, 'r+b') as file:
+                    file.seek(-1, os.SEEK_END)
+                    file.write(b'\xff')
+
+                distanceCalculator.distanceMap.clear()
+                self.assertIsNone(distanceCalculator.getCachedDistanceMatrix(walls))
+
+                # A file for other walls is not used.
+                otherWalls = getLayout('tinyMaze').walls
+                otherPath = os.path.join(tempDir, distanceCalculator.wallsKey(otherWalls)
+                        + distanceCalculator.CACHE_FILE_EXTENSION)
+                distanceCalculator.getDistanceMatrix(walls)
+                os.replace(path, otherPath)
+
+                distanceCalculator.distanceMap.clear()
+                self.assertIsNone(distanceCalculator.getCachedDistanceMatrix(otherWalls))
+            finally:
+                distanceCalculator.diskCacheDir = oldCacheDir
+                distanceCalculator.distanceMap.clear()
+
+    def test_cache_limits(self):
+        oldCacheDir = distanceCalculator.diskCacheDir
+        oldMaxBytes = distanceCalculator.diskCacheMaxBytes
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            distanceCalculator.diskCacheDir = tempDir
+            distanceCalculator.distanceMap.clear()
+
+            try:
+                paths = []
+                for walls in [self.layout.walls, getLayout('tinyMaze').walls]:
+                    distanceCalculator.getDistanceMatrix(walls)
+                    paths.append(os.path.join(tempDir, distanceCalculator.wallsKey(walls)
+                            + distanceCalculator.CACHE_FILE_EXTENSION))
+
+                # Only room for the most recently used file.
+                now = time.time()
+                os.utime(paths[0], (now - 10, now - 10))
+                distanceCalculator.diskCacheMaxBytes = os.path.getsize(paths[1])
+
+                distanceCalculator._pruneCacheDir(tempDir)
+                self.assertEqual([False, True], [os.path.exists(path) for path in paths])
+
+                # Files that are too old are removed.
+                distanceCalculator.diskCacheMaxBytes = oldMaxBytes
+                os.utime(paths[1], (0, 0))
+
+                distanceCalculator._pruneCacheDir(tempDir)
+                self.assertEqual([], os.listdir(tempDir))
+
+                # Directories that other users could write to are not used.
+                if (hasattr(os, 'getuid')):
+                    os.chmod(tempDir, 0o777)
+                    self.assertIsNone(distanceCalculator._getCacheDir())
+                    os.chmod(tempDir, 0o700)
+            finally:
+                distanceCalculator.diskCacheDir = oldCacheDir
+                distanceCalculator.diskCacheMaxBytes = oldMaxBytes
+                distanceCalculator.distanceMap.clear()
+
+    def test_distancer(self):
+        distancer = Distancer(self.layout)
+
+        # Before distances are computed, Manhattan distance is used.
+        self.assertFalse(distancer.isReadyForMazeDistance())
+        self.assertEqual(2, distancer.getDistance((3, 1), (5, 1)))
+
+        distancer.getMazeDistances()
+        self.assertTrue(distancer.isReadyForMazeDistance())
+        self.assertEqual(10, distancer.getDistance((3, 1), (5, 1)))
+        self.assertEqual(1.5, distancer.getDistance((1, 1.5), (1, 3)))
+
+    def test_distances_and_nearest(self):
+        targets = [(5, 1), (1, 3), (3, 1), (1, 1.5)]
+
+        for options in [{}, {'lazy': True}, {'contracted': True}]:
+            distancer = Distancer(self.layout, **options)
+            distancer.getMazeDistances()
+
+            for source in [(1, 1), (1, 2.5), (5, 3)]:
+                expected = [distancer.getDistance(source, target) for target in targets]
+                self.assertEqual(expected, distancer.getDistances(source, targets))
+
+            self.assertEqual(((1, 3), 2), distancer.getNearest((1, 1), targets[:3]))
+            self.assertEqual(((5, 1), 2), distancer.getNearest((5, 3), targets))
+
+            with self.assertRaises(ValueError):
+                distancer.getNearest((1, 1), [])
+
+            # Walls and positions off the grid get the same error as getDistance().
+            for (source, badTargets) in [((1, 1), [(3, 1), (2, 2)]), ((0, 0), [(3, 1)]),
+                    ((1, 1), [(9, 9)])]:
+                with self.assertRaisesRegex(Exception, 'Position not in grid'):
+                    distancer.getDistance(source, badTargets[-1])
+
+                with self.assertRaisesRegex(Exception, 'Position not in grid'):
+                    distancer.getDistances(source, badTargets)
+
+                with self.assertRaisesRegex(Exception, 'Position not in grid'):
+                    distancer.getNearest(source, badTargets)
+
+    def test_lazy(self):
+        distancer = Distancer(self.layout, lazy = True, lazyMaxBytes = 0)
+        self.assertTrue(distancer.isReadyForMazeDistance())
+
+        lazy = distancer._distances
+        self.assertEqual(10, distancer.getDistance((3, 1), (5, 1)))
+        self.assertEqual(1, lazy.misses)
+
+        # Either end of a cached row can be used.
+        self.assertEqual(10, distancer.getDistance((5, 1), (3, 1)))
+        self.assertEqual(6, distancer.getDistance((1, 1), (5, 3)))
+        self.assertEqual(1, lazy.hits)
+        self.assertEqual(2, lazy.misses)
+
+        # Only a single row fits in memory.
+        self.assertEqual(1, lazy.getStats()['rows'])
+        self.assertEqual(1, lazy.evictions)
+
+        full = computeDistances(self.layout)
+        cells = self.layout.walls.asList(False)
+        for pos1 in cells:
+            for pos2 in cells:
+                self.assertEqual(full.getDistance(pos1, pos2), lazy.getDistance(pos1, pos2))
+
+    def test_maze(self):
+        state = PacmanGameState(self.layout)
+
+        self.assertEqual(10, maze((3, 1), (5, 1), state))
+        self.assertEqual(6, maze((1, 1), (5, 3), state))
+        self.assertEqual(0, maze((1, 1), (1, 1), state))
+        self.assertEqual(10, maze((3.0, 1.0), (5, 1.0), state))
+
+        with self.assertRaises(ValueError):
+            maze((2, 2), (1, 1), state)
+
+        with self.assertRaises(ValueError):
+            maze((1.5, 1), (1, 1), state)
+
+    def test_parallel(self):
+        if (distanceCalculator.shared_memory is None):
+            self.skipTest('Shared memory is not available.')
+
+        layout = getLayout('mediumCapture')
+        expected = computeDistances(layout).getRawDistances()
+
+        oldMinCells = distanceCalculator.parallelMinCells
+        oldNumWorkers = distanceCalculator.parallelNumWorkers
+
+        try:
+            distanceCalculator.parallelMinCells = 1
+            distanceCalculator.parallelNumWorkers = 2
+
+            distances = computeDistances(layout)
+
+            # Distancers with a time limit also compute large mazes all at once.
+            distanceCalculator.distanceMap.clear()
+            distancer = Distancer(layout)
+            self.assertTrue(distancer.getMazeDistances(timeLimit = 0))
+        finally:
+            distanceCalculator.parallelMinCells = oldMinCells
+            distanceCalculator.parallelNumWorkers = oldNumWorkers
+            distanceCalculator.distanceMap.clear()
+
+        self.assertEqual(expected, distances.getRawDistances())
+        self.assertEqual(expected, distancer._distances.getRawDistances())
+
+    def test_partial(self):
+        full = computeDistances(self.layout)
+        partial = distanceCalculator.PartialDistances(self.layout.walls)
+
+        self.assertFalse(partial.advance(0))
+        self.assertEqual(1, partial.getNumDone())
+
+        # Neither position has a row yet, so the Manhattan distance is used.
+        self.assertEqual(2, partial.getDistance((3, 1), (5, 1)))
+
+        # Asking again does not request the same source again.
+        for i in range(10):
+            partial.getDistance((3, 1), (5, 1))
+
+        self.assertEqual(1, len(partial._requested))
+
+        # The requested source is computed next.
+        partial.advance(0)
+        self.assertEqual(10, partial.getDistance((3, 1), (5, 1)))
+        self.assertEqual(10, partial.getDistance((5, 1), (3, 1)))
+
+        self.assertTrue(partial.advance())
+        self.assertEqual(list(full.getRawDistances()), list(partial.getMatrix().getRawDistances()))
+
+    def test_distancer_time_limit(self):
+        oldCacheDir = distanceCalculator.diskCacheDir
+        distanceCalculator.diskCacheDir = None
+        distanceCalculator.distanceMap.clear()
+
+        try:
+            distancer = Distancer(self.layout)
+            self.assertFalse(distancer.getMazeDistances(timeLimit = 0))
+            self.assertFalse(distancer.isReadyForMazeDistance())
+
+            # Distances still being computed are shared.
+            other = Distancer(self.layout)
+            self.assertFalse(other.getMazeDistances(timeLimit = 0))
+            self.assertIs(distancer._partialDistances, other._partialDistances)
+            self.assertEqual(2, distancer._partialDistances.getNumDone())
+
+            self.assertTrue(distancer.getMazeDistances(timeLimit = 60))
+            self.assertTrue(distancer.isReadyForMazeDistance())
+            self.assertEqual(10, distancer.getDistance((3, 1), (5, 1)))
+
+            # Finished distances are shared.
+            distancer = Distancer(self.layout)
+            self.assertTrue(distancer.getMazeDistances(timeLimit = 0))
+        finally:
+            distanceCalculator.diskCacheDir = oldCacheDir
+            distanceCalculator.distanceMap.clear()
+
+    def test_symmetric(self):
+        layout = getLayout('mediumCapture')
+        distances = computeDistances(layout)
+        cells = layout.walls.asList(False)
+
+        for pos1 in cells[::7]:
+            for pos2 in cells[::5]:
+                self.assertEqual(distances.getDistance(pos1, pos2),
+                        distances.getDistance(pos2, pos1))
+
+if __name__ == '__main__':
+    unittest.main()
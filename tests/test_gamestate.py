@@ -0,0 +1,172 @@
+import random
+import unittest
+
+from pacai.bin.capture import CaptureGameState
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.directions import Directions
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+
+TEST_LAYOUT = [
+    '%%%%%%',
+    '%.  G%',
+    '% %% %',
+    '%P  o%',
+    '%%%%%%',
+]
+
+"""
+Test game states.
+"""
+class GameStateTest(unittest.TestCase):
+    def setUp(self):
+        self.state = PacmanGameState(Layout(TEST_LAYOUT))
+
+    def test_hash_paths(self):
+        # Reach the same state in two different ways.
+        state1 = self.state
+        for action in [Directions.EAST, Directions.WEST, Directions.EAST]:
+            state1 = state1.generateSuccessor(0, action)
+
+        state2 = self.state
+        for action in [Directions.EAST, Directions.STOP, Directions.STOP]:
+            state2 = state2.generateSuccessor(0, action)
+
+        self.assertEqual(state1, state2)
+        self.assertEqual(hash(state1), hash(state2))
+
+    def test_hash_changes(self):
+        seen = {hash(self.state)}
+
+        state = self.state
+        for action in [Directions.EAST, Directions.EAST, Directions.EAST]:
+            state = state.generateSuccessor(0, action)
+            self.assertNotIn(hash(state), seen)
+            seen.add(hash(state))
+
+        # The capsule was eaten.
+        self.assertEqual(0, state.getNumCapsules())
+        self.assertEqual(1, self.state.getNumCapsules())
+
+    def test_agent_states_copy_on_write(self):
+        successor = self.state.generateSuccessor(0, Directions.EAST)
+
+        # Only the agent that moved gets a new agent state.
+        self.assertIsNot(self.state.getAgentState(0), successor.getAgentState(0))
+        self.assertIs(self.state.getAgentState(1), successor.getAgentState(1))
+
+        self.assertEqual((1, 1), self.state.getPacmanPosition())
+        self.assertEqual((2, 1), successor.getPacmanPosition())
+
+        successor.getMutableAgentState(1).setScaredTimer(10)
+        self.assertEqual(0, self.state.getAgentState(1).getScaredTimer())
+        self.assertEqual(10, successor.getAgentState(1).getScaredTimer())
+
+    def test_food_and_capsule_positions(self):
+        self.assertEqual([(1, 3)], self.state.getFoodPositions())
+        self.assertTrue(self.state.hasCapsule(4, 1))
+        self.assertFalse(self.state.hasCapsule(3, 1))
+        self.assertFalse(self.state.hasCapsule(-1, 1))
+
+        state = self.state.generateSuccessor(0, Directions.NORTH)
+        state = state.generateSuccessor(0, Directions.NORTH)
+        self.assertEqual([], state.getFoodPositions())
+        self.assertEqual([(1, 3)], self.state.getFoodPositions())
+
+        layout = Layout(['%%%%%%', '%. ..%', '%P  .%', '%%%%%%'])
+        state = PacmanGameState(layout)
+        self.assertEqual([(1, 2), (3, 2), (4, 1), (4, 2)],
+                state.getFoodPositionsByDistance((2, 1)))
+
+    def test_bounds(self):
+        # TEST_LAYOUT is 6 wide and 5 tall.
+        self.assertTrue(self.state.hasWall(5, 0))
+        self.assertFalse(self.state.hasFood(1, 1))
+
+        with self.assertRaises(IndexError):
+            self.state.hasWall(6, 0)
+
+        with self.assertRaises(IndexError):
+            self.state.hasWall(0, 5)
+
+        with self.assertRaises(IndexError):
+            self.state.hasFood(1, 5)
+
+        # Negative positions count from the far edge (like lists).
+        self.assertTrue(self.state.hasWall(-1, 1))
+        self.assertFalse(self.state.hasFood(-1, 1))
+
+    def test_eat_capsule(self):
+        state = CaptureGameState(getLayout('defaultCapture'), 200)
+        capsule = state.getCapsules()[0]
+        numCapsules = len(state.getCapsules())
+
+        self.assertFalse(state.eatCapsule(1, 1))
+        self.assertTrue(state.eatCapsule(*capsule))
+        self.assertFalse(state.eatCapsule(*capsule))
+
+        self.assertEqual(numCapsules - 1, len(state.getCapsules()))
+        self.assertEqual(numCapsules - 1,
+                len(state.getRedCapsules()) + len(state.getBlueCapsules()))
+
+    def test_generate_successors(self):
+        for agentIndex in range(self.state.getNumAgents()):
+            successors = list(self.state.generateSuccessors(agentIndex))
+            legal = self.state.getLegalActions(agentIndex)
+
+            self.assertEqual(legal, [action for (action, successor) in successors])
+            for (action, successor) in successors:
+                self.assertEqual(self.state.generateSuccessor(agentIndex, action), successor)
+
+    def test_apply_undo(self):
+        rng = random.Random(4)
+
+        pacmanLayout = getLayout('smallClassic')
+        captureLayout = getLayout('tinyCapture')
+
+        newStates = [
+            lambda: PacmanGameState(pacmanLayout),
+            lambda: CaptureGameState(captureLayout, 200),
+        ]
+
+        for newState in newStates:
+            for i in range(10):
+                state = newState()
+
+                # The same moves made with successors.
+                successors = [newState()]
+                tokens = []
+
+                agentIndex = 0
+                while (not state.isOver() and len(tokens) < 100):
+                    action = rng.choice(state.getLegalActions(agentIndex))
+
+                    successors.append(successors[-1].generateSuccessor(agentIndex, action))
+                    tokens.append(state.applyAction(agentIndex, action))
+
+                    self.assertEqual(successors[-1], state)
+                    self.assertEqual(hash(successors[-1]), hash(state))
+                    self.assertFoodCounts(state)
+
+                    agentIndex = (agentIndex + 1) % state.getNumAgents()
+
+                while (len(tokens) > 0):
+                    state.undo(tokens.pop())
+                    successors.pop()
+
+                    self.assertEqual(successors[-1], state)
+                    self.assertEqual(hash(successors[-1]), hash(state))
+                    self.assertFoodCounts(state)
+
+                self.assertEqual(newState(), state)
+
+    def assertFoodCounts(self, state):
+        self.assertEqual(state.getFood().count(), state.getNumFood())
+        self.assertEqual(state.getFood().asList(), state.getFoodPositions())
+
+        if (isinstance(state, CaptureGameState)):
+            self.assertEqual(state.getRedFood().count(), state.getNumRedFood())
+            self.assertEqual(state.getBlueFood().count(), state.getNumBlueFood())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+from pacai.core.grid import Grid
+from pacai.core.grid import ReadOnlyGrid
+from pacai.core.grid import countBits
+from pacai.core.grid import getBitIndexes
+
+"""
+Test the bitset-backed grid.
+"""
+class GridTest(unittest.TestCase):
+    def test_get_set(self):
+        grid = Grid(4, 3)
+        self.assertFalse(grid[2][1])
+
+        grid[2][1] = True
+        self.assertTrue(grid[2][1])
+        self.assertTrue(grid.get(2, 1))
+
+        grid.set(3, 2, True)
+        self.assertTrue(grid[3][2])
+        self.assertTrue(grid[-1][-1])
+
+        grid[2][1] = False
+        self.assertFalse(grid.get(2, 1))
+
+        with self.assertRaises(IndexError):
+            grid[4][0]
+
+        with self.assertRaises(IndexError):
+            grid[0][3]
+
+    def test_count_and_list(self):
+        grid = Grid(4, 3)
+        positions = [(0, 2), (1, 0), (3, 1), (3, 2)]
+        for (x, y) in positions:
+            grid[x][y] = True
+
+        self.assertEqual(4, grid.count())
+        self.assertEqual(8, grid.count(False))
+        self.assertEqual(positions, grid.asList())
+        self.assertEqual(8, len(grid.asList(False)))
+
+        full = Grid(4, 3, initialValue = True)
+        self.assertEqual(12, full.count())
+        self.assertEqual([], full.asList(False))
+
+    def test_bits(self):
+        for bits in [0, 1, 0b1011, 1 << 100, (1 << 70) - 1]:
+            indexes = [index for index in range(bits.bit_length()) if (bits >> index) & 1]
+
+            self.assertEqual(indexes, getBitIndexes(bits))
+            self.assertEqual(len(indexes), countBits(bits))
+
+    def test_copy_eq_hash(self):
+        grid = Grid(5, 5)
+        grid[1][1] = True
+
+        other = grid.copy()
+        self.assertEqual(grid, other)
+        self.assertEqual(hash(grid), hash(other))
+
+        other[1][1] = False
+        self.assertTrue(grid[1][1])
+        self.assertNotEqual(grid, other)
+
+        # Same bits, different shape.
+        self.assertNotEqual(Grid(2, 3), Grid(3, 2))
+
+    def test_columns(self):
+        grid = Grid(2, 3)
+        grid[1] = [True, False, True]
+
+        self.assertEqual([False, False, False], list(grid[0]))
+        self.assertEqual([True, False, True], list(grid[1]))
+        self.assertEqual(3, len(grid[1]))
+        self.assertEqual("FT\nFF\nFT", str(grid))
+
+    def test_read_only(self):
+        grid = Grid(3, 3)
+        grid[1][2] = True
+
+        view = ReadOnlyGrid(grid)
+        self.assertEqual(grid, view)
+        self.assertTrue(view[1][2])
+
+        with self.assertRaises(TypeError):
+            view[1][2] = False
+
+        with self.assertRaises(TypeError):
+            view.set(0, 0, True)
+
+        with self.assertRaises(TypeError):
+            view[0] = [True, True, True]
+
+        # Copies can be modified.
+        copy = view.copy()
+        copy[1][2] = False
+        self.assertFalse(copy[1][2])
+        self.assertTrue(view[1][2])
+
+if __name__ == '__main__':
+    unittest.main()
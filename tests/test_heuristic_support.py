@@ -0,0 +1,53 @@
+import itertools
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.distanceCalculator import DistanceMatrix
+from pacai.core.grid import getBitIndexes
+from pacai.core.layout import getLayout
+from pacai.core.search import engine
+from pacai.core.search.food import FoodSearchProblem
+from pacai.core.search.heuristicSupport import HeuristicSupport
+from pacai.core.search.heuristicSupport import getHeuristicSupport
+from pacai.student.searchAgents import foodHeuristic
+
+"""
+Test the precomputed heuristic tables.
+"""
+class HeuristicSupportTest(unittest.TestCase):
+    def test_tables(self):
+        walls = getLayout('trickySearch').walls
+        matrix = DistanceMatrix(walls)
+
+        targets = getLayout('trickySearch').food.asList()
+        support = HeuristicSupport(walls, targets)
+
+        for cell in walls.asList(False)[::5]:
+            for (index, target) in enumerate(targets):
+                self.assertEqual(matrix.getDistance(cell, target), support.getDistance(cell, index))
+
+        for mask in [0, 1, 0b1011, 0b11111, (1 << len(targets)) - 1]:
+            indexes = getBitIndexes(mask)
+            self.assertEqual(mask, support.getMask([targets[index] for index in indexes]))
+
+            farthest = max([support.getTargetDistance(i, j)
+                    for (i, j) in itertools.combinations(indexes, 2)] + [0])
+            self.assertEqual(farthest, support.getFarthestPair(mask)[0])
+
+    def test_food_heuristic(self):
+        problem = FoodSearchProblem(PacmanGameState(getLayout('trickySearch')))
+        actions = engine.aStarSearch(problem, foodHeuristic)
+
+        self.assertEqual(60, problem.actionsCost(actions))
+
+        # The tables are only built once per problem.
+        support = getHeuristicSupport(problem, problem.foodPositions)
+        self.assertIs(support, getHeuristicSupport(problem, problem.foodPositions))
+
+        # Different targets get their own tables.
+        other = getHeuristicSupport(problem, problem.foodPositions[:2])
+        self.assertIsNot(support, other)
+        self.assertEqual(problem.foodPositions[:2], other.targets)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import random
+import sys
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core import jumpPoint
+from pacai.core.actions import Actions
+from pacai.core.distanceCalculator import DistanceMatrix
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+from pacai.core.search.position import PositionSearchProblem
+from pacai.core.search.search import jumpPointSearch
+
+"""
+Test Jump Point Search.
+"""
+class JumpPointTest(unittest.TestCase):
+    def test_shortest_paths(self):
+        layouts = [
+            getLayout('openSearch').walls,
+            getLayout('mediumClassic').walls,
+            # Cells that cannot reach each other.
+            Layout(['%%%%%%%', '%   % %', '% % %%%', '%P  %.%', '%%%%%%%']).walls,
+        ]
+
+        for walls in layouts:
+            matrix = DistanceMatrix(walls)
+            cells = walls.asList(False)
+
+            for start in cells[::3]:
+                for end in cells[::2]:
+                    distance = matrix.getDistance(start, end)
+
+                    actions = jumpPoint.getActions(walls, start, end)
+                    if (distance == sys.maxsize):
+                        self.assertIsNone(actions)
+                        continue
+
+                    self.assertEqual(distance, len(actions))
+
+                    position = start
+                    for action in actions:
+                        self.assertIn(action, Actions.getPossibleActions(position, None, walls))
+                        dx, dy = Actions.directionToVector(action)
+                        position = (int(position[0] + dx), int(position[1] + dy))
+
+                    self.assertEqual(end, position)
+
+    def test_random_walls(self):
+        rng = random.Random(7)
+
+        for i in range(10):
+            rows = ['%' * 10]
+            for y in range(6):
+                rows.append('%' + ''.join(rng.choice('%   ') for x in range(8)) + '%')
+            rows.append('%' * 10)
+
+            walls = Layout(rows).walls
+            matrix = DistanceMatrix(walls)
+            cells = walls.asList(False)
+
+            for start in cells:
+                for end in cells:
+                    path = jumpPoint.getPath(walls, start, end)
+                    if (path is None):
+                        self.assertEqual(sys.maxsize, matrix.getDistance(start, end))
+                    else:
+                        self.assertEqual(matrix.getDistance(start, end), len(path) - 1)
+
+    def test_open_room(self):
+        walls = getLayout('openSearch').walls
+
+        # Only the corners of the path are jump points.
+        self.assertEqual([(1, 1), (1, 5), (18, 5)], jumpPoint.getJumpPoints(walls, (1, 1), (18, 5)))
+
+        state = PacmanGameState(getLayout('openSearch'))
+        problem = PositionSearchProblem(state, goal = (18, 5), start = (1, 1))
+        self.assertEqual(21, problem.actionsCost(jumpPointSearch(problem)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from pacai.core.layout import compileLayout
+from pacai.core.layout import getLayout
+from pacai.core.layout import loadCompiledLayout
+
+"""
+Test loading, caching, and compiling layouts.
+"""
+class LayoutTest(unittest.TestCase):
+    def test_cache(self):
+        self.assertIs(getLayout('smallClassic'), getLayout('smallClassic.lay'))
+        self.assertIsNot(getLayout('smallClassic'), getLayout('smallClassic', maxGhosts = 1))
+
+    def test_compiled(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, 'layout.layc')
+
+            for maxGhosts in [None, 0, 1, 2]:
+                layout = getLayout('mediumClassic', maxGhosts = maxGhosts)
+                compileLayout(layout, path)
+                compiled = loadCompiledLayout(path, maxGhosts)
+
+                self.assertEqual(layout.walls, compiled.walls)
+                self.assertEqual(layout.food, compiled.food)
+                self.assertEqual(layout.capsules, compiled.capsules)
+                self.assertEqual(layout.agentPositions, compiled.agentPositions)
+                self.assertEqual(layout.numGhosts, compiled.numGhosts)
+                self.assertEqual(layout.layoutText, compiled.layoutText)
+
+                moveTable = compiled.getMoveTable()
+                self.assertEqual(layout.getMoveTable().getLegalNeighbors((1, 1)),
+                        moveTable.getLegalNeighbors((1, 1)))
+
+    def test_compiled_opt_in(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            text = ['%%%%%', '%P .%', '%%%%%']
+            with open(os.path.join(tempDir, 'test.lay'), 'w') as file:
+                file.write('\n'.join(text) + '\n')
+
+            # A compiled file for a different layout (same name, newer).
+            compileLayout(getLayout('tinyMaze'), os.path.join(tempDir, 'test.layc'))
+
+            self.assertEqual(text, getLayout('test', tempDir).layoutText)
+            self.assertEqual(getLayout('tinyMaze').layoutText,
+                    getLayout('test', tempDir, compiled = True).layoutText)
+
+            # Compiled layouts are data only.
+            with open(os.path.join(tempDir, 'bad.layc'), 'w') as file:
+                file.write('{"version": 2, "width": 1, "height": 1, "walls": [], "food": "0", '
+                        + '"objects": []}')
+
+            with self.assertRaises(ValueError):
+                loadCompiledLayout(os.path.join(tempDir, 'bad.layc'))
+
+    def test_is_wall(self):
+        layout = getLayout('tinyCapture')
+
+        self.assertTrue(layout.isWall((0, 0)))
+        self.assertFalse(layout.isWall((1, 1)))
+
+        with self.assertRaises(IndexError):
+            layout.isWall((layout.width, 1))
+
+        with self.assertRaises(IndexError):
+            layout.isWall((1, layout.height))
+
+    def test_deep_copy(self):
+        layout = getLayout('tinyCapture')
+        copy = layout.deepCopy()
+
+        self.assertEqual(layout.agentPositions, copy.agentPositions)
+
+        copy.food.set(1, 1, not copy.food.get(1, 1))
+        self.assertNotEqual(layout.food, copy.food)
+
+if __name__ == '__main__':
+    unittest.main()
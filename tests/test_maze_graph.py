@@ -0,0 +1,61 @@
+import sys
+import unittest
+
+from pacai.core.actions import Actions
+from pacai.core.distanceCalculator import DistanceMatrix
+from pacai.core.layout import Layout
+from pacai.core.layout import getLayout
+from pacai.core.mazeGraph import MazeGraph
+
+"""
+Test the contracted maze graph.
+"""
+class MazeGraphTest(unittest.TestCase):
+    def test_contraction(self):
+        layout = getLayout('mediumClassic')
+        graph = MazeGraph(layout.walls)
+
+        self.assertLess(graph.getNumNodes(), layout.walls.count(False) / 4)
+
+        for corridor in graph.corridors:
+            for (i, cell) in enumerate(corridor.cells):
+                self.assertFalse(graph.isNode(cell))
+                self.assertEqual((corridor, i + 1), graph.getCorridor(cell))
+
+    def test_distances_and_paths(self):
+        layouts = [
+            getLayout('mediumClassic').walls,
+            getLayout('tinyCapture').walls,
+            # A loop without any junctions.
+            Layout(['%%%%%', '%   %', '% % %', '%P  %', '%%%%%']).walls,
+            # Cells that cannot reach each other.
+            Layout(['%%%%%%%', '%   % %', '% % %%%', '%P  %.%', '%%%%%%%']).walls,
+        ]
+
+        for walls in layouts:
+            graph = MazeGraph(walls)
+            matrix = DistanceMatrix(walls)
+            cells = walls.asList(False)
+
+            for start in cells[::3]:
+                for end in cells[::2]:
+                    distance = matrix.getDistance(start, end)
+                    self.assertEqual(distance, graph.getDistance(start, end))
+
+                    actions = graph.getActions(start, end)
+                    if (distance == sys.maxsize):
+                        self.assertIsNone(actions)
+                        continue
+
+                    self.assertEqual(distance, len(actions))
+
+                    position = start
+                    for action in actions:
+                        self.assertIn(action, Actions.getPossibleActions(position, None, walls))
+                        dx, dy = Actions.directionToVector(action)
+                        position = (int(position[0] + dx), int(position[1] + dy))
+
+                    self.assertEqual(end, position)
+
+if __name__ == '__main__':
+    unittest.main()
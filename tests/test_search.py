@@ -0,0 +1,128 @@
+import unittest
+
+from pacai.bin.pacman import PacmanGameState
+from pacai.core.layout import getLayout
+from pacai.core.search import engine
+from pacai.core.search import heuristic
+from pacai.core.search.food import FoodSearchProblem
+from pacai.core.search.position import PositionSearchProblem
+from pacai.student import search
+from pacai.student.searchAgents import AnyFoodSearchProblem
+
+"""
+Test the search engine against the reference search functions.
+"""
+class SearchEngineTest(unittest.TestCase):
+    def test_position_search(self):
+        for layoutName in ['tinyMaze', 'mediumMaze', 'openMaze']:
+            state = PacmanGameState(getLayout(layoutName))
+
+            # DFS and BFS find exactly the same paths.
+            for (reference, function) in [
+                    (search.depthFirstSearch, engine.depthFirstSearch),
+                    (search.breadthFirstSearch, engine.breadthFirstSearch)]:
+                self.assertEqual(reference(PositionSearchProblem(state)),
+                        function(PositionSearchProblem(state)))
+
+            # UCS and A* find paths with the same cost.
+            expected = search.uniformCostSearch(PositionSearchProblem(state))
+
+            actions = engine.uniformCostSearch(PositionSearchProblem(state))
+            self.assertEqual(len(expected), len(actions))
+            self.assertLess(PositionSearchProblem(state).actionsCost(actions), 999999)
+
+            actions = engine.aStarSearch(PositionSearchProblem(state), heuristic.manhattan)
+            self.assertEqual(len(expected), len(actions))
+            self.assertLess(PositionSearchProblem(state).actionsCost(actions), 999999)
+
+    def test_bidirectional(self):
+        state = PacmanGameState(getLayout('openSearch'))
+        costFn = lambda position: 1 + (position[0] + position[1]) % 3
+
+        for (start, goal) in [((1, 1), (18, 5)), ((5, 3), (5, 3)), ((18, 5), (2, 4))]:
+            expected = engine.ucs(PositionSearchProblem(state, costFn, goal, start))
+            expectedCost = PositionSearchProblem(state, costFn, goal, start).actionsCost(expected)
+
+            problem = PositionSearchProblem(state, goal = goal, start = start)
+            self.assertEqual(len(engine.bfs(problem)), len(engine.bibfs(problem)))
+
+            biastar = lambda problem: engine.biastar(problem, heuristic.manhattan)
+            for function in [engine.biucs, biastar]:
+                problem = PositionSearchProblem(state, costFn, goal, start)
+                self.assertEqual(expectedCost, problem.actionsCost(function(problem)))
+
+        # Searching from both ends expands fewer nodes.
+        forward = PositionSearchProblem(state, goal = (18, 5), start = (1, 1))
+        engine.bfs(forward)
+
+        bidirectional = PositionSearchProblem(state, goal = (18, 5), start = (1, 1))
+        engine.bibfs(bidirectional)
+
+        self.assertLess(bidirectional.getExpandedCount(), forward.getExpandedCount())
+
+        # Problems that cannot be searched backwards are rejected before searching.
+        problem = FoodSearchProblem(PacmanGameState(getLayout('tinySearch')))
+        for function in [engine.bibfs, engine.biucs, biastar]:
+            with self.assertRaises(ValueError):
+                function(problem)
+
+        self.assertEqual(0, problem.getExpandedCount())
+
+        # Problems with their own goal test have no single goal to search back from.
+        problem = AnyFoodSearchProblem(PacmanGameState(getLayout('mediumMaze')))
+        for function in [engine.bibfs, engine.biucs, biastar]:
+            with self.assertRaises(ValueError):
+                function(problem)
+
+        self.assertEqual(0, problem.getExpandedCount())
+
+        # Backward expansions are shown in the GUI too.
+        self.assertIn((18, 5), bidirectional.getVisitHistory())
+
+    def test_food_search(self):
+        state = PacmanGameState(getLayout('tinySearch'))
+
+        problem = FoodSearchProblem(state)
+        actions = engine.aStarSearch(problem, heuristic.numFood)
+
+        self.assertEqual(27, problem.actionsCost(actions))
+
+    def test_food_search_states(self):
+        state = PacmanGameState(getLayout('tinySearch'))
+        problem = FoodSearchProblem(state)
+
+        start = problem.startingState()
+        self.assertEqual(state.getNumFood(), start.getNumFood())
+
+        # States still unpack into a position and a food grid.
+        (position, food) = start
+        self.assertEqual(state.getPacmanPosition(), position)
+        self.assertEqual(state.getFood(), food)
+        self.assertEqual(position, start[0])
+        self.assertEqual(food, start[-1])
+        self.assertEqual((position, food), start[:])
+
+        with self.assertRaises(IndexError):
+            start[2]
+
+        # Moving onto food eats it.
+        for (successor, action, cost) in problem.successorStates(start):
+            x, y = successor.getPosition()
+            self.assertNotIn((x, y), successor.getFoodPositions())
+            self.assertEqual(start.getNumFood() - int(state.hasFood(x, y)), successor.getNumFood())
+
+            # Going back reaches a different state only if food was eaten.
+            for (previous, action, cost) in problem.successorStates(successor):
+                if (previous.getPosition() == position):
+                    self.assertEqual(not state.hasFood(x, y), previous == start)
+                    self.assertEqual(previous == start, hash(previous) == hash(start))
+
+    def test_no_path(self):
+        state = PacmanGameState(getLayout('tinyMaze'))
+
+        # A goal inside a wall can never be reached.
+        for function in [engine.dfs, engine.bfs, engine.ucs, engine.bibfs, engine.biucs]:
+            self.assertIsNone(function(PositionSearchProblem(state, goal = (0, 0))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,10 +18,29 @@ class UtilContainersTest(unittest.TestCase):
         self.assertFalse(testQueue.isEmpty())
         self.assertEquals(len(val_list), len(testQueue))
 
+        # The list has the most recently enqueued item first.
+        self.assertEqual(list(reversed(val_list)), testQueue.list)
+
         # Test Queue for FIFO functionality.
         for val in val_list:
             self.assertEqual(val, testQueue.pop())
 
+    def test_keyed_containers(self):
+        for container in [queue.Queue(key = lambda item: item[0]),
+                stack.Stack(key = lambda item: item[0])]:
+            container.push(('a', [1]))
+            container.push(('b', [2]))
+            container.push(('a', [3]))
+
+            self.assertIn('a', container)
+            self.assertIn('b', container)
+            self.assertNotIn('c', container)
+
+            container.pop()
+            container.pop()
+            self.assertEqual(1, len(container))
+            self.assertEqual(1, len([key for key in ['a', 'b'] if (key in container)]))
+
     def test_stack(self):
         testStack = stack.Stack()
         self.assertTrue(testStack.isEmpty())
@@ -52,5 +71,40 @@ class UtilContainersTest(unittest.TestCase):
         for val, pri in reversed(val_list):
             self.assertEqual(val, testPriorityQueue.pop())
 
+    def test_indexed_priority_queue(self):
+        testPriorityQueue = priorityQueue.IndexedPriorityQueue()
+        self.assertTrue(testPriorityQueue.isEmpty())
+
+        # Unorderable items with tied priorities.
+        keys = [object() for x in range(200)]
+        for key in keys:
+            testPriorityQueue.push(key, 5)
+
+        self.assertEqual(len(keys), len(testPriorityQueue))
+        self.assertTrue(testPriorityQueue.contains(keys[3]))
+        self.assertEqual(5, testPriorityQueue.priorityOf(keys[3]))
+
+        # Only lower priorities are taken by update().
+        self.assertFalse(testPriorityQueue.update(keys[3], 7))
+        self.assertTrue(testPriorityQueue.update(keys[3], 2))
+        testPriorityQueue.decreaseKey(keys[10], 1)
+        self.assertEqual(1, testPriorityQueue.priorityOf(keys[10]))
+
+        with self.assertRaises(ValueError):
+            testPriorityQueue.decreaseKey(keys[10], 3)
+
+        # Removing most items compacts the heap.
+        for key in keys[20:]:
+            testPriorityQueue.remove(key)
+
+        self.assertNotIn(keys[20], testPriorityQueue)
+        self.assertEqual(20, len(testPriorityQueue))
+        self.assertLess(len(testPriorityQueue.heap), len(keys))
+
+        # Ties keep their push order.
+        expected = [keys[10], keys[3]] + [key for key in keys[:20] if (key not in keys[3:11:7])]
+        self.assertEqual(expected, [testPriorityQueue.pop() for i in range(20)])
+        self.assertTrue(testPriorityQueue.isEmpty())
+
 if __name__ == '__main__':
     unittest.main()